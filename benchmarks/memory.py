@@ -0,0 +1,38 @@
+import gc
+import sys
+import tracemalloc
+from lox.scanner import Scanner
+from lox.parser import Parser
+from benchmarks.run import BENCHMARKS, read_benchmark
+
+# Memory used by the front end on a multi-megabyte source, built by repeating
+# the standard workloads.
+def large_source(megabytes):
+    suite = "\n".join(read_benchmark(name) for name in BENCHMARKS)
+    return suite * (megabytes * 1_000_000 // len(suite) + 1)
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+def main(megabytes=4):
+    source = large_source(megabytes)
+    tokens, size = measure(lambda: Scanner(source).scan_tokens())
+    lexemes = len({id(token.lexeme) for token in tokens})
+    print(f"source        {len(source) / 1e6:>10.1f} MB")
+    print(f"tokens        {len(tokens):>10,}")
+    print(f"token list    {size / 1e6:>10.1f} MB  ({size / len(tokens):.0f} bytes/token)")
+    print(f"lexeme objects{lexemes:>11,}")
+    del tokens
+    buffer, size = measure(lambda: Scanner(source).scan_buffer())
+    print(f"token buffer  {size / 1e6:>10.1f} MB  ({size / len(buffer):.0f} bytes/token)")
+    del buffer
+    _, size = measure(lambda: Parser(Scanner(source).scan()).parse())
+    print(f"syntax tree   {size / 1e6:>10.1f} MB")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4)
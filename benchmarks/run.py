@@ -0,0 +1,153 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.optimizer import Optimizer
+from lox.lox import ENGINES
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lox")
+BENCHMARKS = sorted(name[:-4] for name in os.listdir(BENCHMARK_DIR) if name.endswith(".lox"))
+PHASES = ("scan", "parse", "resolve", "optimize", "execute")
+
+def read_benchmark(name):
+    with open(os.path.join(BENCHMARK_DIR, name + ".lox")) as file:
+        return file.read()
+
+def run_once(engine, source):
+    timings = {}
+    start = time.perf_counter()
+    tokens = Scanner(source).scan_tokens()
+    timings["scan"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    statements = Parser(tokens).parse()
+    timings["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    Resolver().resolve_stmts(statements)
+    timings["resolve"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    statements = Optimizer().optimize(statements)
+    timings["optimize"] = time.perf_counter() - start
+
+    interpreter = ENGINES[engine]()
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        interpreter.interpret(statements)
+    timings["execute"] = time.perf_counter() - start
+    timings["total"] = sum(timings.values())
+    return timings, output.getvalue()
+
+def summarize(samples):
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.mean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+def measure(engine, name, warmup, repeat):
+    source = read_benchmark(name)
+    for _ in range(warmup):
+        run_once(engine, source)
+    runs = []
+    outputs = set()
+    for _ in range(repeat):
+        timings, output = run_once(engine, source)
+        runs.append(timings)
+        outputs.add(output)
+    if len(outputs) != 1:
+        raise RuntimeError(f"{name} printed different output on different runs under {engine}")
+    result = {phase: summarize([run[phase] for run in runs]) for phase in PHASES + ("total",)}
+    result["output"] = outputs.pop()
+    return result
+
+def compare(results, baseline, threshold, metric="median"):
+    regressions = []
+    for name, engines in results.items():
+        for engine, result in engines.items():
+            previous = baseline.get(name, {}).get(engine)
+            if previous is None:
+                continue
+            if previous["output"] != result["output"]:
+                regressions.append((name, engine, None))
+                print(f"{name:<18}{engine:<10}output differs from the baseline  REGRESSION")
+                continue
+            old = previous["total"][metric]
+            new = result["total"][metric]
+            change = (new - old) / old if old else 0.0
+            marker = ""
+            if change > threshold:
+                regressions.append((name, engine, change))
+                marker = "  REGRESSION"
+            print(f"{name:<18}{engine:<10}{old * 1000:>10.1f}ms -> {new * 1000:>10.1f}ms {change:>+8.1%}{marker}")
+    return regressions
+
+def print_results(results):
+    print(f"{'benchmark':<18}{'engine':<10}" + "".join(f"{phase:>11}" for phase in PHASES + ("total",)))
+    for name, engines in results.items():
+        for engine, result in engines.items():
+            cells = "".join(f"{result[phase]['median'] * 1000:>9.1f}ms" for phase in PHASES + ("total",))
+            print(f"{name:<18}{engine:<10}{cells}")
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks.run")
+    parser.add_argument("benchmarks", nargs="*", metavar="benchmark",
+                        help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--engine", action="append", choices=sorted(ENGINES), help="engine to measure; repeatable (default: tree)")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs before measuring")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="compare median totals against a saved JSON result")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that fails the comparison")
+    options = parser.parse_args(argv)
+    unknown = [name for name in options.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+    if options.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    return options
+
+def main(argv):
+    options = parse_args(argv)
+    sys.setrecursionlimit(10000)
+    names = options.benchmarks or BENCHMARKS
+    engines = options.engine or ["tree"]
+    results = {}
+    for name in names:
+        results[name] = {engine: measure(engine, name, options.warmup, options.repeat) for engine in engines}
+    print_results(results)
+
+    if options.json:
+        document = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "warmup": options.warmup,
+            "repeat": options.repeat,
+            "results": results,
+        }
+        with open(options.json, "w") as file:
+            json.dump(document, file, indent=2)
+
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)["results"]
+        print()
+        regressions = compare(results, baseline, options.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed against {options.baseline} (threshold {options.threshold:.0%})")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
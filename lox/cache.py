@@ -0,0 +1,160 @@
+import array
+import hashlib
+import marshal
+import os
+import sys
+from . import expr, stmt
+from .token_file import Token
+from .token_type import TokenType
+
+CACHE_DIR = "__loxcache__"
+MAGIC = b"LOXC"
+FORMAT_VERSION = 1
+
+NODE_CLASSES = expr.EXPR_NODES + stmt.STMT_NODES
+NODE_CLASS_SET = frozenset(NODE_CLASSES)
+TOKEN = len(NODE_CLASSES)
+TOKEN_TYPES = list(TokenType)
+TOKEN_TYPE_IDS = {token_type: index for index, token_type in enumerate(TOKEN_TYPES)}
+
+# Modules whose code decides what a cached program looks like. Editing any of
+# them changes the fingerprint, so stale caches are never loaded.
+FRONTEND_MODULES = ("token_type.py", "token_file.py", "scanner.py", "parser.py", "resolver.py", "expr.py", "stmt.py")
+
+_fingerprint = None
+
+def fingerprint():
+    global _fingerprint
+    if _fingerprint is None:
+        digest = hashlib.sha256(f"{FORMAT_VERSION}:{sys.version_info[:2]}".encode())
+        package = os.path.dirname(os.path.abspath(__file__))
+        for name in FRONTEND_MODULES:
+            with open(os.path.join(package, name), "rb") as file:
+                digest.update(file.read())
+        _fingerprint = digest.digest()
+    return _fingerprint
+
+def cache_path(script):
+    directory, name = os.path.split(os.path.abspath(script))
+    return os.path.join(directory, CACHE_DIR, os.path.splitext(name)[0] + ".loxc")
+
+def source_key(source):
+    return hashlib.sha256(fingerprint() + source.encode()).digest()
+
+# A program is stored as one flat array of integers in prefix order plus a
+# table of the distinct constants (strings, numbers, booleans, nil) it refers
+# to. Each value starts with a code: a node class id followed by its
+# attributes, TOKEN followed by its type, lexeme and literal constant indexes
+# and line, LIST followed by a length, INT followed by the value itself, or
+# CONSTANT + n for the n-th constant. Node class ids are the nodes' `kind`,
+# and each node's __slots__ are written in order; the slot names are stored
+# once per class so a changed node definition is never misread.
+LIST, INT, CONSTANT = TOKEN + 1, TOKEN + 2, TOKEN + 3
+
+class Encoder:
+    def __init__(self):
+        self.codes = array.array("i")
+        self.fields = {}
+        self.constants = []
+        self.constant_ids = {}
+
+    def constant(self, value):
+        key = (value.__class__, value)
+        index = self.constant_ids.get(key)
+        if index is None:
+            index = self.constant_ids[key] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    def encode(self, value):
+        cls = value.__class__
+        codes = self.codes
+        if cls is int:
+            codes.append(INT)
+            codes.append(value)
+        elif cls is list:
+            codes.append(LIST)
+            codes.append(len(value))
+            for item in value:
+                self.encode(item)
+        elif cls is Token:
+            codes.append(TOKEN)
+            codes.append(TOKEN_TYPE_IDS[value.token_type])
+            codes.append(self.constant(value.lexeme))
+            codes.append(self.constant(value.literal))
+            codes.append(value.line)
+        elif cls in NODE_CLASS_SET:
+            kind = cls.kind
+            self.fields.setdefault(kind, cls.__slots__)
+            codes.append(kind)
+            for name in cls.__slots__:
+                self.encode(getattr(value, name))
+        elif value is None or cls in (str, float, bool):
+            codes.append(CONSTANT + self.constant(value))
+        else:
+            raise ValueError(f"can't cache a {cls.__name__}")
+
+def decode(codes, fields, constants):
+    take = iter(codes).__next__
+    def value():
+        tag = take()
+        if tag >= CONSTANT:
+            return constants[tag - CONSTANT]
+        if tag < TOKEN:
+            node_class = NODE_CLASSES[tag]
+            node = node_class.__new__(node_class)
+            for name in fields[tag]:
+                setattr(node, name, value())
+            return node
+        if tag == TOKEN:
+            return Token(TOKEN_TYPES[take()], constants[take()], constants[take()], take())
+        if tag == LIST:
+            return [value() for _ in range(take())]
+        if tag == INT:
+            return take()
+        raise ValueError(f"bad tag {tag}")
+    return value()
+
+def load(script, source):
+    try:
+        with open(cache_path(script), "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC or file.read(32) != source_key(source):
+                return None
+            digest = file.read(32)
+            payload = file.read()
+        if hashlib.sha256(payload).digest() != digest:
+            return None
+        fields, constants, data = marshal.loads(payload)
+        codes = array.array("i")
+        codes.frombytes(data)
+        return decode(codes, fields, constants)
+    except (OSError, EOFError, ValueError, TypeError, KeyError, IndexError, StopIteration, RecursionError):
+        return None
+
+def store(script, source, statements):
+    path = cache_path(script)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        encoder = Encoder()
+        encoder.encode(statements)
+        payload = marshal.dumps((encoder.fields, encoder.constants, encoder.codes.tobytes()))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary, "wb") as file:
+            file.write(MAGIC)
+            file.write(source_key(source))
+            file.write(hashlib.sha256(payload).digest())
+            file.write(payload)
+        os.replace(temporary, path)
+    except (OSError, ValueError, RecursionError):
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+# Removes only this script's cached program; the directory goes too once no
+# other script's program is left in it.
+def clear(script):
+    path = cache_path(script)
+    try:
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+    except OSError:
+        pass
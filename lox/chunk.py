@@ -0,0 +1,74 @@
+OP_CONSTANT = 0
+OP_NIL = 1
+OP_TRUE = 2
+OP_FALSE = 3
+OP_POP = 4
+OP_GET_LOCAL = 5
+OP_SET_LOCAL = 6
+OP_GET_GLOBAL = 7
+OP_DEFINE_GLOBAL = 8
+OP_SET_GLOBAL = 9
+OP_GET_UPVALUE = 10
+OP_SET_UPVALUE = 11
+OP_GET_PROPERTY = 12
+OP_SET_PROPERTY = 13
+OP_GET_SUPER = 14
+OP_EQUAL = 15
+OP_NOT_EQUAL = 16
+OP_GREATER = 17
+OP_GREATER_EQUAL = 18
+OP_LESS = 19
+OP_LESS_EQUAL = 20
+OP_ADD = 21
+OP_SUBTRACT = 22
+OP_MULTIPLY = 23
+OP_DIVIDE = 24
+OP_NOT = 25
+OP_NEGATE = 26
+OP_PRINT = 27
+OP_JUMP = 28
+OP_JUMP_IF_FALSE = 29
+OP_LOOP = 30
+OP_CALL = 31
+OP_INVOKE = 32
+OP_SUPER_INVOKE = 33
+OP_CLOSURE = 34
+OP_CLOSE_UPVALUE = 35
+OP_RETURN = 36
+OP_CLASS = 37
+OP_INHERIT = 38
+OP_METHOD = 39
+
+OPCODE_NAMES = {value: name for name, value in globals().items() if name.startswith("OP_")}
+
+class Chunk:
+    def __init__(self):
+        self.code = bytearray()
+        self.lines = []
+        self.constants = []
+        self.constant_indexes = {}
+
+    def write(self, byte, line):
+        self.code.append(byte)
+        self.lines.append(line)
+
+    def add_constant(self, value):
+        if isinstance(value, str):
+            index = self.constant_indexes.get(value)
+            if index is not None:
+                return index
+            self.constant_indexes[value] = len(self.constants)
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+class VMFunction:
+    def __init__(self, name):
+        self.name = name
+        self.arity = 0
+        self.upvalue_count = 0
+        self.chunk = Chunk()
+
+    def __str__(self):
+        if self.name is None:
+            return "<script>"
+        return f"<fn {self.name}>"
@@ -0,0 +1,370 @@
+from .token_type import TokenType
+from .objects import *
+from .expr import *
+from .stmt import *
+from .operators import *
+from .interpreter import Interpreter
+
+class ClosureFunction(LoxFunction):
+    def __init__(self, declaration, closure, is_initializer, body):
+        super().__init__(declaration, closure, is_initializer)
+        self.body = body
+        if body is None:
+            self.slot_count = None
+        else:
+            self.statements, self.result = body
+
+    def load(self, interpreter):
+        super().load(interpreter)
+        self.body = interpreter.compile_function_body(self.declaration)
+        self.statements, self.result = self.body
+
+    def run(self, interpreter, environment):
+        for stmt in self.statements:
+            if stmt(environment) is RETURN:
+                return interpreter.return_value
+        if self.result is not None:
+            return self.result(environment)
+        return None
+
+class ClosureInterpreter(Interpreter):
+    def __init__(self):
+        super().__init__()
+        self.compilers = {
+            Assign: self.compile_assign,
+            Binary: self.compile_binary,
+            Call: self.compile_call,
+            Get: self.compile_get,
+            Grouping: self.compile_grouping,
+            Literal: self.compile_literal,
+            Logical: self.compile_logical,
+            Set: self.compile_set,
+            Super: self.compile_super,
+            This: self.compile_this,
+            Unary: self.compile_unary,
+            Variable: self.compile_variable,
+            Block: self.compile_block,
+            Class: self.compile_class,
+            Expression: self.compile_expression,
+            Function: self.compile_function,
+            If: self.compile_if,
+            Print: self.compile_print,
+            Return: self.compile_return,
+            Var: self.compile_var,
+            While: self.compile_while,
+        }
+
+    def interpret(self, statements):
+        for stmt in self.compile_block_body(statements):
+            stmt(self.globals)
+
+    def compile(self, node):
+        return self.compilers[type(node)](node)
+
+    def compile_block_body(self, statements):
+        return [self.compile(stmt) for stmt in statements]
+
+    def compile_literal(self, expr):
+        value = expr.value
+        return lambda env: value
+
+    def compile_grouping(self, expr):
+        return self.compile(expr.expression)
+
+    def compile_unary(self, expr):
+        right = self.compile(expr.right)
+        op = unary_handler(expr.operator)
+        return lambda env: op(right(env))
+
+    def compile_binary(self, expr):
+        left = self.compile(expr.left)
+        op = binary_handler(expr.operator)
+        if isinstance(expr.right, Literal) and expr.right.value.__class__ is float:
+            constant = expr.right.value
+            return lambda env: op(left(env), constant)
+        right = self.compile(expr.right)
+        return lambda env: op(left(env), right(env))
+
+    def compile_logical(self, expr):
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+        is_truthy = self.is_truthy
+        if expr.operator.token_type == TokenType.OR:
+            def logical_or(env):
+                value = left(env)
+                if is_truthy(value):
+                    return value
+                return right(env)
+            return logical_or
+        def logical_and(env):
+            value = left(env)
+            if not is_truthy(value):
+                return value
+            return right(env)
+        return logical_and
+
+    def compile_lookup(self, depth, slot, name):
+        if depth is None:
+            values = self.globals.values
+            def lookup_global(env):
+                try:
+                    return values[name]
+                except KeyError:
+                    raise RuntimeError(f"Undefined variable '{name}'.") from None
+            return lookup_global
+        if depth == 0:
+            return lambda env: env.values[slot]
+        if depth == 1:
+            return lambda env: env.enclosing.values[slot]
+        def lookup(env):
+            for _ in range(depth):
+                env = env.enclosing
+            return env.values[slot]
+        return lookup
+
+    def compile_variable(self, expr):
+        return self.compile_lookup(expr.depth, expr.slot, expr.name.lexeme)
+
+    def compile_this(self, expr):
+        return self.compile_lookup(expr.depth, expr.slot, expr.keyword.lexeme)
+
+    def compile_assign(self, expr):
+        name = expr.name.lexeme
+        value = self.compile(expr.value)
+        depth = expr.depth
+        slot = expr.slot
+        if depth is None:
+            values = self.globals.values
+            def assign_global(env):
+                result = value(env)
+                if name not in values:
+                    raise RuntimeError(f"Undefined variable '{name}'.")
+                values[name] = result
+                return result
+            return assign_global
+        def assign(env):
+            result = value(env)
+            for _ in range(depth):
+                env = env.enclosing
+            env.values[slot] = result
+            return result
+        return assign
+
+    def compile_define(self, stmt):
+        slot = stmt.slot
+        if slot is None:
+            name = stmt.name.lexeme
+            values = self.globals.values
+            def define_global(env, value):
+                values[name] = value
+            return define_global
+        def define(env, value):
+            env.values[slot] = value
+        return define
+
+    # A tail call only evaluates its callee and arguments, leaving the call for
+    # the trampoline in complete_tail_calls to make.
+    def compile_call(self, expr, tail=False):
+        if expr.callee.__class__ is Get:
+            return self.compile_property_call(expr, expr.callee, tail)
+        callee = self.compile(expr.callee)
+        arguments = [self.compile(arg) for arg in expr.arguments]
+        paren = expr.paren
+        interpreter = self
+        def call(env):
+            function = callee(env)
+            args = [arg(env) for arg in arguments]
+            if not isinstance(function, LoxCallable):
+                raise RuntimeError(paren, "Can only call functions and classes.")
+            if len(args) != function.arity():
+                raise RuntimeError(paren, f"Expected {function.arity()} arguments but got {len(args)}.")
+            if tail:
+                interpreter.tail_call = (function, None, args)
+                return TAIL_CALL
+            return function.call(interpreter, args)
+        return call
+
+    def compile_property_call(self, expr, get, tail=False):
+        obj = self.compile(get.object)
+        arguments = [self.compile(arg) for arg in expr.arguments]
+        name = get.name
+        paren = expr.paren
+        interpreter = self
+        def call_property(env):
+            instance = obj(env)
+            if not isinstance(instance, LoxInstance):
+                raise RuntimeError(name, "Only instances have properties.")
+            if instance.shape is not get.cache_shape:
+                cache_lookup(get, instance, name)
+            index = get.cache_index
+            function = instance.values[index] if index >= 0 else get.cache_method
+            args = [arg(env) for arg in arguments]
+            if not isinstance(function, LoxCallable):
+                raise RuntimeError(paren, "Can only call functions and classes.")
+            if len(args) != function.arity():
+                raise RuntimeError(paren, f"Expected {function.arity()} arguments but got {len(args)}.")
+            if tail:
+                interpreter.tail_call = (function, instance if index < 0 else None, args)
+                return TAIL_CALL
+            if index < 0:
+                return function.call_method(interpreter, instance, args)
+            return function.call(interpreter, args)
+        return call_property
+
+    def compile_get(self, expr):
+        obj = self.compile(expr.object)
+        name = expr.name
+        def get(env):
+            instance = obj(env)
+            if isinstance(instance, LoxInstance):
+                if instance.shape is expr.cache_shape:
+                    index = expr.cache_index
+                    if index >= 0:
+                        return instance.values[index]
+                    return expr.cache_method.bind(instance)
+                return cache_get(expr, instance, name)
+            raise RuntimeError(name, "Only instances have properties.")
+        return get
+
+    def compile_set(self, expr):
+        obj = self.compile(expr.object)
+        value = self.compile(expr.value)
+        name = expr.name
+        def set_(env):
+            instance = obj(env)
+            if not isinstance(instance, LoxInstance):
+                raise RuntimeError(name, "Only instances have fields.")
+            result = value(env)
+            if instance.shape is expr.cache_shape:
+                transition = expr.cache_transition
+                if transition is None:
+                    instance.values[expr.cache_index] = result
+                else:
+                    instance.shape = transition
+                    instance.values.append(result)
+            else:
+                cache_set(expr, instance, name, result)
+            return result
+        return set_
+
+    def compile_super(self, expr):
+        keyword = expr.keyword
+        method_name = expr.method
+        depth = expr.depth
+        def super_(env):
+            for _ in range(depth - 1):
+                env = env.enclosing
+            obj = env.values[0]
+            superclass = env.enclosing.values[0]
+            if not isinstance(superclass, LoxClass):
+                raise RuntimeError(keyword, "super must be a class.")
+            method = superclass.find_method(method_name.lexeme)
+            if method is None:
+                raise RuntimeError(method_name, f"Undefined property '{method_name.lexeme}'.")
+            return method.bind(obj)
+        return super_
+
+    def compile_var(self, stmt):
+        define = self.compile_define(stmt)
+        if stmt.initializer is None:
+            return lambda env: define(env, None)
+        initializer = self.compile(stmt.initializer)
+        slot = stmt.slot
+        if slot is not None:
+            def define_local(env):
+                env.values[slot] = initializer(env)
+            return define_local
+        return lambda env: define(env, initializer(env))
+
+    def compile_print(self, stmt):
+        expression = self.compile(stmt.expression)
+        stringify = self.stringify
+        def print_(env):
+            print(stringify(expression(env)))
+        return print_
+
+    def compile_expression(self, stmt):
+        return self.compile(stmt.expression)
+
+    def compile_block(self, stmt):
+        statements = self.compile_block_body(stmt.statements)
+        slot_count = stmt.slot_count
+        def block(env):
+            inner = Environment(env, slot_count)
+            for s in statements:
+                if s(inner) is RETURN:
+                    return RETURN
+        return block
+
+    def compile_if(self, stmt):
+        condition = self.compile(stmt.condition)
+        then_branch = self.compile(stmt.then_branch)
+        else_branch = self.compile(stmt.else_branch) if stmt.else_branch else None
+        is_truthy = self.is_truthy
+        def if_(env):
+            if is_truthy(condition(env)):
+                return then_branch(env)
+            elif else_branch is not None:
+                return else_branch(env)
+        return if_
+
+    def compile_while(self, stmt):
+        condition = self.compile(stmt.condition)
+        body = self.compile(stmt.body)
+        is_truthy = self.is_truthy
+        def while_(env):
+            while is_truthy(condition(env)):
+                if body(env) is RETURN:
+                    return RETURN
+        return while_
+
+    def compile_function(self, stmt):
+        define = self.compile_define(stmt)
+        body = self.compile_function_body(stmt) if stmt.body is not None else None
+        def function(env):
+            define(env, ClosureFunction(stmt, env, False, body))
+        return function
+
+    def compile_class(self, stmt):
+        name = stmt.name
+        define = self.compile_define(stmt)
+        superclass_expr = self.compile(stmt.superclass) if stmt.superclass else None
+        methods = [(method, self.compile_function_body(method) if method.body is not None else None) for method in stmt.methods]
+        def class_(env):
+            superclass = None
+            if superclass_expr is not None:
+                superclass = superclass_expr(env)
+                if not isinstance(superclass, LoxClass):
+                    raise RuntimeError(stmt.superclass.name, "Superclass must be a class.")
+            define(env, None)
+            method_env = env
+            if superclass is not None:
+                method_env = Environment(env, 1)
+                method_env.values[0] = superclass
+            functions = {}
+            for method, body in methods:
+                lexeme = method.name.lexeme
+                functions[lexeme] = ClosureFunction(method, method_env, lexeme == "init", body)
+            define(env, LoxClass(name.lexeme, superclass, functions))
+        return class_
+
+    def compile_function_body(self, declaration):
+        statements = declaration.body
+        if statements and isinstance(statements[-1], Return):
+            trailing = statements[-1]
+            result = self.compile_return_value(trailing)
+            return self.compile_block_body(statements[:-1]), result
+        return self.compile_block_body(statements), None
+
+    def compile_return_value(self, stmt):
+        if stmt.tail_call:
+            return self.compile_call(stmt.value, tail=True)
+        return self.compile(stmt.value) if stmt.value is not None else None
+
+    def compile_return(self, stmt):
+        value = self.compile_return_value(stmt)
+        interpreter = self
+        def return_(env):
+            interpreter.return_value = value(env) if value is not None else None
+            return RETURN
+        return return_
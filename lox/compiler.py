@@ -0,0 +1,465 @@
+import enum
+from .token_type import TokenType
+from .expr import *
+from .stmt import *
+from .chunk import *
+
+UINT8_COUNT = 256
+
+class FunctionType(enum.Enum):
+    SCRIPT = enum.auto()
+    FUNCTION = enum.auto()
+    INITIALIZER = enum.auto()
+    METHOD = enum.auto()
+
+BINARY_OPCODES = {
+    TokenType.PLUS: OP_ADD,
+    TokenType.MINUS: OP_SUBTRACT,
+    TokenType.STAR: OP_MULTIPLY,
+    TokenType.SLASH: OP_DIVIDE,
+    TokenType.GREATER: OP_GREATER,
+    TokenType.GREATER_EQUAL: OP_GREATER_EQUAL,
+    TokenType.LESS: OP_LESS,
+    TokenType.LESS_EQUAL: OP_LESS_EQUAL,
+    TokenType.EQUAL_EQUAL: OP_EQUAL,
+    TokenType.BANG_EQUAL: OP_NOT_EQUAL,
+}
+
+class Local:
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+        self.is_captured = False
+
+class FunctionState:
+    def __init__(self, enclosing, kind, name):
+        self.enclosing = enclosing
+        self.kind = kind
+        self.function = VMFunction(name)
+        self.upvalues = []
+        self.scope_depth = 0
+        receiver = "this" if kind in (FunctionType.METHOD, FunctionType.INITIALIZER) else ""
+        self.locals = [Local(receiver, 0)]
+
+class ClassState:
+    def __init__(self, enclosing):
+        self.enclosing = enclosing
+        self.has_superclass = False
+
+class Compiler(Expr.Visitor, Stmt.Visitor):
+    def __init__(self):
+        self.current = None
+        self.current_class = None
+        self.line = 1
+
+    def compile(self, statements):
+        self.current = FunctionState(None, FunctionType.SCRIPT, None)
+        for stmt in statements:
+            self.compile_node(stmt)
+        self.emit_return()
+        function = self.current.function
+        self.current = None
+        return function
+
+    def compile_node(self, node):
+        node.accept(self)
+
+    def error(self, message):
+        raise ValueError(f"[line {self.line}] Error: {message}")
+
+    # Emitting bytecode
+
+    def chunk(self):
+        return self.current.function.chunk
+
+    def emit_byte(self, byte):
+        self.chunk().write(byte, self.line)
+
+    def emit_bytes(self, *data):
+        for byte in data:
+            self.emit_byte(byte)
+
+    def emit_short(self, value):
+        self.emit_bytes((value >> 8) & 0xff, value & 0xff)
+
+    def emit_with_constant(self, op, index):
+        self.emit_byte(op)
+        self.emit_short(index)
+
+    def make_constant(self, value):
+        index = self.chunk().add_constant(value)
+        if index > 0xffff:
+            self.error("Too many constants in one chunk.")
+        return index
+
+    def identifier_constant(self, name):
+        return self.make_constant(name)
+
+    def emit_constant(self, value):
+        self.emit_with_constant(OP_CONSTANT, self.make_constant(value))
+
+    def emit_jump(self, op):
+        self.emit_bytes(op, 0xff, 0xff)
+        return len(self.chunk().code) - 2
+
+    def patch_jump(self, offset):
+        code = self.chunk().code
+        jump = len(code) - offset - 2
+        if jump > 0xffff:
+            self.error("Too much code to jump over.")
+        code[offset] = (jump >> 8) & 0xff
+        code[offset + 1] = jump & 0xff
+
+    def emit_loop(self, loop_start):
+        self.emit_byte(OP_LOOP)
+        offset = len(self.chunk().code) - loop_start + 2
+        if offset > 0xffff:
+            self.error("Loop body too large.")
+        self.emit_short(offset)
+
+    def emit_return(self):
+        if self.current.kind == FunctionType.INITIALIZER:
+            self.emit_bytes(OP_GET_LOCAL, 0)
+        else:
+            self.emit_byte(OP_NIL)
+        self.emit_byte(OP_RETURN)
+
+    # Scopes and variables
+
+    def begin_scope(self):
+        self.current.scope_depth += 1
+
+    def end_scope(self):
+        state = self.current
+        state.scope_depth -= 1
+        while state.locals and state.locals[-1].depth > state.scope_depth:
+            if state.locals[-1].is_captured:
+                self.emit_byte(OP_CLOSE_UPVALUE)
+            else:
+                self.emit_byte(OP_POP)
+            state.locals.pop()
+
+    def add_local(self, name):
+        if len(self.current.locals) == UINT8_COUNT:
+            self.error("Too many local variables in function.")
+        self.current.locals.append(Local(name, -1))
+
+    def declare_variable(self, name):
+        state = self.current
+        if state.scope_depth == 0:
+            return
+        for local in reversed(state.locals):
+            if local.depth != -1 and local.depth < state.scope_depth:
+                break
+            if local.name == name:
+                self.error("Already a variable with this name in this scope.")
+        self.add_local(name)
+
+    def parse_variable(self, name):
+        self.declare_variable(name)
+        if self.current.scope_depth > 0:
+            return 0
+        return self.identifier_constant(name)
+
+    def mark_initialized(self):
+        state = self.current
+        if state.scope_depth == 0:
+            return
+        state.locals[-1].depth = state.scope_depth
+
+    def define_variable(self, global_index):
+        if self.current.scope_depth > 0:
+            self.mark_initialized()
+            return
+        self.emit_with_constant(OP_DEFINE_GLOBAL, global_index)
+
+    def resolve_local(self, state, name):
+        for i in range(len(state.locals) - 1, -1, -1):
+            local = state.locals[i]
+            if local.name == name:
+                if local.depth == -1:
+                    self.error("Can't read local variable in its own initializer.")
+                return i
+        return -1
+
+    def add_upvalue(self, state, index, is_local):
+        for i, upvalue in enumerate(state.upvalues):
+            if upvalue == (index, is_local):
+                return i
+        if len(state.upvalues) == UINT8_COUNT:
+            self.error("Too many closure variables in function.")
+        state.upvalues.append((index, is_local))
+        state.function.upvalue_count = len(state.upvalues)
+        return len(state.upvalues) - 1
+
+    def resolve_upvalue(self, state, name):
+        if state.enclosing is None:
+            return -1
+        local = self.resolve_local(state.enclosing, name)
+        if local != -1:
+            state.enclosing.locals[local].is_captured = True
+            return self.add_upvalue(state, local, True)
+        upvalue = self.resolve_upvalue(state.enclosing, name)
+        if upvalue != -1:
+            return self.add_upvalue(state, upvalue, False)
+        return -1
+
+    def named_variable(self, name, value=None):
+        arg = self.resolve_local(self.current, name)
+        if arg != -1:
+            get_op, set_op, wide = OP_GET_LOCAL, OP_SET_LOCAL, False
+        else:
+            arg = self.resolve_upvalue(self.current, name)
+            if arg != -1:
+                get_op, set_op, wide = OP_GET_UPVALUE, OP_SET_UPVALUE, False
+            else:
+                arg = self.identifier_constant(name)
+                get_op, set_op, wide = OP_GET_GLOBAL, OP_SET_GLOBAL, True
+        op = get_op
+        if value is not None:
+            self.compile_node(value)
+            op = set_op
+        if wide:
+            self.emit_with_constant(op, arg)
+        else:
+            self.emit_bytes(op, arg)
+
+    def function(self, declaration, kind):
+        self.current = FunctionState(self.current, kind, declaration.name.lexeme)
+        self.begin_scope()
+        for param in declaration.params:
+            self.line = param.line
+            self.current.function.arity += 1
+            if self.current.function.arity > 255:
+                self.error("Can't have more than 255 parameters.")
+            self.declare_variable(param.lexeme)
+            self.mark_initialized()
+        for stmt in declaration.body:
+            self.compile_node(stmt)
+        self.emit_return()
+
+        state = self.current
+        self.current = state.enclosing
+        self.emit_with_constant(OP_CLOSURE, self.make_constant(state.function))
+        for index, is_local in state.upvalues:
+            self.emit_bytes(1 if is_local else 0, index)
+
+    def arguments(self, arguments):
+        if len(arguments) > 255:
+            self.error("Can't have more than 255 arguments.")
+        for arg in arguments:
+            self.compile_node(arg)
+        return len(arguments)
+
+    # Statements
+
+    def visit_block_stmt(self, stmt):
+        self.begin_scope()
+        for statement in stmt.statements:
+            self.compile_node(statement)
+        self.end_scope()
+
+    def visit_class_stmt(self, stmt):
+        self.line = stmt.name.line
+        class_name = stmt.name.lexeme
+        name_constant = self.identifier_constant(class_name)
+        self.declare_variable(class_name)
+        self.emit_with_constant(OP_CLASS, name_constant)
+        self.define_variable(name_constant)
+
+        class_state = ClassState(self.current_class)
+        self.current_class = class_state
+
+        if stmt.superclass is not None:
+            if stmt.superclass.name.lexeme == class_name:
+                self.error("A class can't inherit from itself.")
+            self.named_variable(stmt.superclass.name.lexeme)
+            self.begin_scope()
+            self.add_local("super")
+            self.define_variable(0)
+            self.named_variable(class_name)
+            self.emit_byte(OP_INHERIT)
+            class_state.has_superclass = True
+
+        self.named_variable(class_name)
+        for method in stmt.methods:
+            self.line = method.name.line
+            kind = FunctionType.INITIALIZER if method.name.lexeme == "init" else FunctionType.METHOD
+            self.function(method, kind)
+            self.emit_with_constant(OP_METHOD, self.identifier_constant(method.name.lexeme))
+        self.emit_byte(OP_POP)
+
+        if class_state.has_superclass:
+            self.end_scope()
+        self.current_class = class_state.enclosing
+
+    def visit_expression_stmt(self, stmt):
+        self.compile_node(stmt.expression)
+        self.emit_byte(OP_POP)
+
+    def visit_function_stmt(self, stmt):
+        self.line = stmt.name.line
+        global_index = self.parse_variable(stmt.name.lexeme)
+        self.mark_initialized()
+        self.function(stmt, FunctionType.FUNCTION)
+        self.define_variable(global_index)
+
+    def visit_if_stmt(self, stmt):
+        self.compile_node(stmt.condition)
+        then_jump = self.emit_jump(OP_JUMP_IF_FALSE)
+        self.emit_byte(OP_POP)
+        self.compile_node(stmt.then_branch)
+        else_jump = self.emit_jump(OP_JUMP)
+        self.patch_jump(then_jump)
+        self.emit_byte(OP_POP)
+        if stmt.else_branch is not None:
+            self.compile_node(stmt.else_branch)
+        self.patch_jump(else_jump)
+
+    def visit_print_stmt(self, stmt):
+        self.compile_node(stmt.expression)
+        self.emit_byte(OP_PRINT)
+
+    def visit_return_stmt(self, stmt):
+        self.line = stmt.keyword.line
+        if self.current.kind == FunctionType.SCRIPT:
+            self.error("Can't return from top-level code.")
+        if stmt.value is None:
+            self.emit_return()
+            return
+        if self.current.kind == FunctionType.INITIALIZER:
+            self.error("Can't return a value from an initializer.")
+        self.compile_node(stmt.value)
+        self.emit_byte(OP_RETURN)
+
+    def visit_var_stmt(self, stmt):
+        self.line = stmt.name.line
+        global_index = self.parse_variable(stmt.name.lexeme)
+        if stmt.initializer is not None:
+            self.compile_node(stmt.initializer)
+        else:
+            self.emit_byte(OP_NIL)
+        self.define_variable(global_index)
+
+    def visit_while_stmt(self, stmt):
+        loop_start = len(self.chunk().code)
+        self.compile_node(stmt.condition)
+        exit_jump = self.emit_jump(OP_JUMP_IF_FALSE)
+        self.emit_byte(OP_POP)
+        self.compile_node(stmt.body)
+        self.emit_loop(loop_start)
+        self.patch_jump(exit_jump)
+        self.emit_byte(OP_POP)
+
+    # Expressions
+
+    def visit_assign_expr(self, expr):
+        self.line = expr.name.line
+        self.named_variable(expr.name.lexeme, expr.value)
+
+    def visit_binary_expr(self, expr):
+        self.compile_node(expr.left)
+        self.compile_node(expr.right)
+        self.line = expr.operator.line
+        op = BINARY_OPCODES.get(expr.operator.token_type)
+        if op is None:
+            self.error(f"Unknown binary operator {expr.operator.token_type}")
+        self.emit_byte(op)
+
+    def visit_call_expr(self, expr):
+        callee = expr.callee
+        if isinstance(callee, Get):
+            self.compile_node(callee.object)
+            name = self.identifier_constant(callee.name.lexeme)
+            argc = self.arguments(expr.arguments)
+            self.line = expr.paren.line
+            self.emit_with_constant(OP_INVOKE, name)
+            self.emit_byte(argc)
+        elif isinstance(callee, Super):
+            self.check_super(callee)
+            self.named_variable("this")
+            name = self.identifier_constant(callee.method.lexeme)
+            argc = self.arguments(expr.arguments)
+            self.named_variable("super")
+            self.line = expr.paren.line
+            self.emit_with_constant(OP_SUPER_INVOKE, name)
+            self.emit_byte(argc)
+        else:
+            self.compile_node(callee)
+            argc = self.arguments(expr.arguments)
+            self.line = expr.paren.line
+            self.emit_bytes(OP_CALL, argc)
+
+    def visit_get_expr(self, expr):
+        self.compile_node(expr.object)
+        self.line = expr.name.line
+        self.emit_with_constant(OP_GET_PROPERTY, self.identifier_constant(expr.name.lexeme))
+
+    def visit_grouping_expr(self, expr):
+        self.compile_node(expr.expression)
+
+    def visit_literal_expr(self, expr):
+        value = expr.value
+        if value is None:
+            self.emit_byte(OP_NIL)
+        elif value is True:
+            self.emit_byte(OP_TRUE)
+        elif value is False:
+            self.emit_byte(OP_FALSE)
+        else:
+            self.emit_constant(value)
+
+    def visit_logical_expr(self, expr):
+        self.compile_node(expr.left)
+        self.line = expr.operator.line
+        if expr.operator.token_type == TokenType.AND:
+            end_jump = self.emit_jump(OP_JUMP_IF_FALSE)
+            self.emit_byte(OP_POP)
+            self.compile_node(expr.right)
+            self.patch_jump(end_jump)
+        else:
+            else_jump = self.emit_jump(OP_JUMP_IF_FALSE)
+            end_jump = self.emit_jump(OP_JUMP)
+            self.patch_jump(else_jump)
+            self.emit_byte(OP_POP)
+            self.compile_node(expr.right)
+            self.patch_jump(end_jump)
+
+    def visit_set_expr(self, expr):
+        self.compile_node(expr.object)
+        self.compile_node(expr.value)
+        self.line = expr.name.line
+        self.emit_with_constant(OP_SET_PROPERTY, self.identifier_constant(expr.name.lexeme))
+
+    def check_super(self, expr):
+        self.line = expr.keyword.line
+        if self.current_class is None:
+            self.error("Can't use 'super' outside of a class.")
+        if not self.current_class.has_superclass:
+            self.error("Can't use 'super' in a class with no superclass.")
+
+    def visit_super_expr(self, expr):
+        self.check_super(expr)
+        self.named_variable("this")
+        self.named_variable("super")
+        self.emit_with_constant(OP_GET_SUPER, self.identifier_constant(expr.method.lexeme))
+
+    def visit_this_expr(self, expr):
+        self.line = expr.keyword.line
+        if self.current_class is None:
+            self.error("Can't use 'this' outside of a class.")
+        self.named_variable("this")
+
+    def visit_unary_expr(self, expr):
+        self.compile_node(expr.right)
+        self.line = expr.operator.line
+        if expr.operator.token_type == TokenType.MINUS:
+            self.emit_byte(OP_NEGATE)
+        elif expr.operator.token_type == TokenType.BANG:
+            self.emit_byte(OP_NOT)
+        else:
+            self.error(f"Unknown unary operator {expr.operator.token_type}")
+
+    def visit_variable_expr(self, expr):
+        self.line = expr.name.line
+        self.named_variable(expr.name.lexeme)
@@ -0,0 +1,92 @@
+from .chunk import *
+
+SIMPLE = "simple"
+BYTE = "byte"
+CONSTANT = "constant"
+JUMP = "jump"
+LOOP = "loop"
+INVOKE = "invoke"
+CLOSURE = "closure"
+
+FORMATS = {
+    OP_GET_LOCAL: BYTE,
+    OP_SET_LOCAL: BYTE,
+    OP_GET_UPVALUE: BYTE,
+    OP_SET_UPVALUE: BYTE,
+    OP_CALL: BYTE,
+    OP_CONSTANT: CONSTANT,
+    OP_GET_GLOBAL: CONSTANT,
+    OP_DEFINE_GLOBAL: CONSTANT,
+    OP_SET_GLOBAL: CONSTANT,
+    OP_GET_PROPERTY: CONSTANT,
+    OP_SET_PROPERTY: CONSTANT,
+    OP_GET_SUPER: CONSTANT,
+    OP_CLASS: CONSTANT,
+    OP_METHOD: CONSTANT,
+    OP_JUMP: JUMP,
+    OP_JUMP_IF_FALSE: JUMP,
+    OP_LOOP: LOOP,
+    OP_INVOKE: INVOKE,
+    OP_SUPER_INVOKE: INVOKE,
+    OP_CLOSURE: CLOSURE,
+}
+
+def disassemble(function):
+    lines = []
+    functions = [function]
+    while functions:
+        current = functions.pop(0)
+        lines.append(f"== {current} ==")
+        offset = 0
+        chunk = current.chunk
+        while offset < len(chunk.code):
+            offset = disassemble_instruction(chunk, offset, lines)
+        functions.extend(c for c in chunk.constants if isinstance(c, VMFunction))
+    return "\n".join(lines)
+
+def read_short(chunk, offset):
+    return (chunk.code[offset] << 8) | chunk.code[offset + 1]
+
+def disassemble_instruction(chunk, offset, lines):
+    if offset > 0 and chunk.lines[offset] == chunk.lines[offset - 1]:
+        prefix = f"{offset:04d}    | "
+    else:
+        prefix = f"{offset:04d} {chunk.lines[offset]:4d} "
+    op = chunk.code[offset]
+    name = OPCODE_NAMES.get(op, f"Unknown opcode {op}")
+    kind = FORMATS.get(op, SIMPLE)
+
+    if kind == SIMPLE:
+        lines.append(prefix + name)
+        return offset + 1
+    if kind == BYTE:
+        lines.append(f"{prefix}{name:<16} {chunk.code[offset + 1]:4d}")
+        return offset + 2
+    if kind == CONSTANT:
+        index = read_short(chunk, offset + 1)
+        lines.append(f"{prefix}{name:<16} {index:4d} '{chunk.constants[index]}'")
+        return offset + 3
+    if kind == JUMP:
+        jump = read_short(chunk, offset + 1)
+        lines.append(f"{prefix}{name:<16} {offset:4d} -> {offset + 3 + jump}")
+        return offset + 3
+    if kind == LOOP:
+        jump = read_short(chunk, offset + 1)
+        lines.append(f"{prefix}{name:<16} {offset:4d} -> {offset + 3 - jump}")
+        return offset + 3
+    if kind == INVOKE:
+        index = read_short(chunk, offset + 1)
+        argc = chunk.code[offset + 3]
+        lines.append(f"{prefix}{name:<16} ({argc} args) {index:4d} '{chunk.constants[index]}'")
+        return offset + 4
+
+    index = read_short(chunk, offset + 1)
+    function = chunk.constants[index]
+    lines.append(f"{prefix}{name:<16} {index:4d} {function}")
+    offset += 3
+    for _ in range(function.upvalue_count):
+        is_local = chunk.code[offset]
+        slot = chunk.code[offset + 1]
+        lines.append(f"{offset:04d}    |                     {'local' if is_local else 'upvalue'} {slot}")
+        offset += 2
+    return offset
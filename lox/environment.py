@@ -1,7 +1,7 @@
-class Environment:
-    def __init__(self, enclosing = None):
+class GlobalEnvironment:
+    def __init__(self):
         self.values = {}
-        self.enclosing = enclosing
+        self.enclosing = None
 
     def _key(self, name):
         return name.lexeme if hasattr(name, "lexeme") else name
@@ -13,27 +13,30 @@ class Environment:
         key = self._key(name)
         if key in self.values:
             return self.values[key]
-        if self.enclosing:
-            return self.enclosing.get(key)
         raise RuntimeError(f"Undefined variable '{key}'.")
 
     def assign(self, name, value):
         key = self._key(name)
         if key in self.values:
             self.values[key] = value
-        elif self.enclosing:
-            self.enclosing.assign(key, value)
         else:
             raise RuntimeError(f"Undefined variable '{key}'.")
 
-    def get_at(self, distance, name):
-        env = self
-        for _ in range(distance):
-            env = env.enclosing
-        return env.values[self._key(name)]
+class Environment:
+    __slots__ = ("values", "enclosing")
+
+    def __init__(self, enclosing, size):
+        self.values = [None] * size
+        self.enclosing = enclosing
 
-    def assign_at(self, distance, name, value):
+    def ancestor(self, distance):
         env = self
         for _ in range(distance):
             env = env.enclosing
-        env.values[self._key(name)] = value
+        return env
+
+    def get_at(self, distance, slot):
+        return self.ancestor(distance).values[slot]
+
+    def assign_at(self, distance, slot, value):
+        self.ancestor(distance).values[slot] = value
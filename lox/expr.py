@@ -1,6 +1,9 @@
+# Generated by tools/generate_ast.py from its node definitions; edit those
+# and regenerate instead of changing this file.
 from abc import ABC, abstractmethod
 
 class Expr(ABC):
+	__slots__ = ()
 
 	@abstractmethod
 	def accept(self, visitor):
@@ -57,25 +60,42 @@ class Expr(ABC):
 			pass
 
 class Assign(Expr):
+	__slots__ = ("name", "value", "depth", "slot",)
+	kind = 0
 
 	def __init__(self, name, value):
 		self.name = name
 		self.value = value
+		self.depth = None
+		self.slot = None
 
 	def accept(self, visitor):
 		return visitor.visit_assign_expr(self)
 
+	@property
+	def line(self):
+		return self.name.line
+
 class Binary(Expr):
+	__slots__ = ("left", "operator", "right", "handler",)
+	kind = 1
 
 	def __init__(self, left, operator, right):
 		self.left = left
 		self.operator = operator
 		self.right = right
+		self.handler = None
 
 	def accept(self, visitor):
 		return visitor.visit_binary_expr(self)
 
+	@property
+	def line(self):
+		return self.operator.line
+
 class Call(Expr):
+	__slots__ = ("callee", "paren", "arguments",)
+	kind = 2
 
 	def __init__(self, callee, paren, arguments):
 		self.callee = callee
@@ -85,16 +105,32 @@ class Call(Expr):
 	def accept(self, visitor):
 		return visitor.visit_call_expr(self)
 
+	@property
+	def line(self):
+		return self.paren.line
+
 class Get(Expr):
+	__slots__ = ("object", "name", "cache_shape", "cache_index", "cache_method", "cache_entries",)
+	kind = 3
 
 	def __init__(self, object, name):
 		self.object = object
 		self.name = name
+		self.cache_shape = None
+		self.cache_index = -1
+		self.cache_method = None
+		self.cache_entries = None
 
 	def accept(self, visitor):
 		return visitor.visit_get_expr(self)
 
+	@property
+	def line(self):
+		return self.name.line
+
 class Grouping(Expr):
+	__slots__ = ("expression",)
+	kind = 4
 
 	def __init__(self, expression):
 		self.expression = expression
@@ -102,7 +138,13 @@ class Grouping(Expr):
 	def accept(self, visitor):
 		return visitor.visit_grouping_expr(self)
 
+	@property
+	def line(self):
+		return self.expression.line
+
 class Literal(Expr):
+	__slots__ = ("value",)
+	kind = 5
 
 	def __init__(self, value):
 		self.value = value
@@ -110,7 +152,13 @@ class Literal(Expr):
 	def accept(self, visitor):
 		return visitor.visit_literal_expr(self)
 
+	@property
+	def line(self):
+		return None
+
 class Logical(Expr):
+	__slots__ = ("left", "operator", "right",)
+	kind = 6
 
 	def __init__(self, left, operator, right):
 		self.left = left
@@ -120,46 +168,93 @@ class Logical(Expr):
 	def accept(self, visitor):
 		return visitor.visit_logical_expr(self)
 
+	@property
+	def line(self):
+		return self.operator.line
+
 class Set(Expr):
+	__slots__ = ("object", "name", "value", "cache_shape", "cache_index", "cache_transition", "cache_entries",)
+	kind = 7
 
 	def __init__(self, object, name, value):
 		self.object = object
 		self.name = name
 		self.value = value
+		self.cache_shape = None
+		self.cache_index = -1
+		self.cache_transition = None
+		self.cache_entries = None
 
 	def accept(self, visitor):
 		return visitor.visit_set_expr(self)
 
+	@property
+	def line(self):
+		return self.name.line
+
 class Super(Expr):
+	__slots__ = ("keyword", "method", "depth", "slot",)
+	kind = 8
 
 	def __init__(self, keyword, method):
 		self.keyword = keyword
 		self.method = method
+		self.depth = None
+		self.slot = None
 
 	def accept(self, visitor):
 		return visitor.visit_super_expr(self)
 
+	@property
+	def line(self):
+		return self.keyword.line
+
 class This(Expr):
+	__slots__ = ("keyword", "depth", "slot",)
+	kind = 9
 
 	def __init__(self, keyword):
 		self.keyword = keyword
+		self.depth = None
+		self.slot = None
 
 	def accept(self, visitor):
 		return visitor.visit_this_expr(self)
 
+	@property
+	def line(self):
+		return self.keyword.line
+
 class Unary(Expr):
+	__slots__ = ("operator", "right", "handler",)
+	kind = 10
 
 	def __init__(self, operator, right):
 		self.operator = operator
 		self.right = right
+		self.handler = None
 
 	def accept(self, visitor):
 		return visitor.visit_unary_expr(self)
 
+	@property
+	def line(self):
+		return self.operator.line
+
 class Variable(Expr):
+	__slots__ = ("name", "depth", "slot",)
+	kind = 11
 
 	def __init__(self, name):
 		self.name = name
+		self.depth = None
+		self.slot = None
 
 	def accept(self, visitor):
-		return visitor.visit_variable_expr(self)
\ No newline at end of file
+		return visitor.visit_variable_expr(self)
+
+	@property
+	def line(self):
+		return self.name.line
+
+EXPR_NODES = (Assign, Binary, Call, Get, Grouping, Literal, Logical, Set, Super, This, Unary, Variable,)
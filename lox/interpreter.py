@@ -1,5 +1,11 @@
 from .token_type import *
 from .objects import * 
+from .expr import Get, EXPR_NODES
+from .stmt import STMT_NODES
+from .operators import *
+from .resolver import Resolver
+from .natives import NativeFunction, STANDARD_LIBRARY
+from .vectors import VECTOR_LIBRARY
 
 class Token:
     def __init__(self, lexeme):
@@ -7,31 +13,42 @@ class Token:
 
 class Interpreter:
     def __init__(self):
-        self.globals = Environment() 
+        self.globals = GlobalEnvironment()
         self.environment = self.globals
-        self.locals = {}
+        self.return_value = None
+        self.tail_call = None
+        # Visit methods indexed by node kind, so dispatch skips `accept`.
+        self.visitors = [
+            getattr(self, f"visit_{cls.__name__.lower()}_{cls.__base__.__name__.lower()}")
+            for cls in EXPR_NODES + STMT_NODES
+        ]
+        for name, arity, function in STANDARD_LIBRARY + VECTOR_LIBRARY:
+            self.define_native(name, arity, function)
+
+    def define_native(self, name, arity, function):
+        self.globals.define(name, NativeFunction(name, arity, function))
 
     def interpret(self, statements):
         for stmt in statements:
             self.execute(stmt)
 
-    def resolve(self, expr, depth):
-        self.locals[expr] = depth
-
     def evaluate(self, expr):
-        return expr.accept(self)
+        return self.visitors[expr.kind](expr)
 
     def execute(self, stmt):
-        stmt.accept(self)
+        return self.visitors[stmt.kind](stmt)
 
     def execute_block(self, statements, environment):
         previous = self.environment
+        visitors = self.visitors
         try:
             self.environment = environment
             for stmt in statements:
-                self.execute(stmt)
+                if visitors[stmt.kind](stmt) is RETURN:
+                    return RETURN
         finally:
             self.environment = previous
+        return None
     
     def visit_literal_expr(self, expr):
         return expr.value
@@ -40,72 +57,98 @@ class Interpreter:
         return self.evaluate(expr.expression)
 
     def visit_unary_expr(self, expr):
-        right = self.evaluate(expr.right)
-        t = expr.operator.token_type
-        if t == TokenType.MINUS:
-            return -right
-        elif t == TokenType.BANG:
-            return not self.is_truthy(right)
-        raise RuntimeError(f"Unknown unary operator {t}")
+        right = expr.right
+        right = self.visitors[right.kind](right)
+        handler = expr.handler
+        if handler is None:
+            handler = expr.handler = unary_handler(expr.operator)
+        return handler(right)
 
     def visit_binary_expr(self, expr):
-        left = self.evaluate(expr.left)
-        right = self.evaluate(expr.right)
-        t = expr.operator.token_type
-        if t == TokenType.PLUS:
-            if isinstance(left, str) or isinstance(right, str):
-                return self.stringify(left) + self.stringify(right)
-            return left + right
-        elif t == TokenType.MINUS:
-            return left - right
-        elif t == TokenType.STAR:
-            return left * right
-        elif t == TokenType.SLASH:
-            return left / right
-        elif t == TokenType.GREATER:
-            return left > right
-        elif t == TokenType.GREATER_EQUAL:
-            return left >= right
-        elif t == TokenType.LESS:
-            return left < right
-        elif t == TokenType.LESS_EQUAL:
-            return left <= right
-        elif t == TokenType.EQUAL_EQUAL:
-            return left == right
-        elif t == TokenType.BANG_EQUAL:
-            return left != right
-        raise RuntimeError(f"Unknown binary operator {t}")
+        visitors = self.visitors
+        left = expr.left
+        left = visitors[left.kind](left)
+        right = expr.right
+        right = visitors[right.kind](right)
+        handler = expr.handler
+        if handler is None:
+            handler = expr.handler = binary_handler(expr.operator)
+        return handler(left, right)
 
     def visit_variable_expr(self, expr):
-        distance = self.locals.get(expr)
-        if distance is not None:
-            return self.environment.get_at(distance, expr.name)
-        return self.environment.get(expr.name)
+        depth = expr.depth
+        if depth is None:
+            return self.globals.get(expr.name)
+        env = self.environment
+        while depth:
+            env = env.enclosing
+            depth -= 1
+        return env.values[expr.slot]
 
     def visit_assign_expr(self, expr):
         value = None
         if expr.value is not None:
             value = self.evaluate(expr.value)
-        distance = self.locals.get(expr)
-        if distance is not None:
-            self.environment.assign_at(distance, expr.name, value)
-        else:
-            self.environment.assign(expr.name, value)
+        depth = expr.depth
+        if depth is None:
+            self.globals.assign(expr.name, value)
+            return value
+        env = self.environment
+        while depth:
+            env = env.enclosing
+            depth -= 1
+        env.values[expr.slot] = value
         return value
 
     def visit_call_expr(self, expr):
+        callee, instance, arguments = self.call_target(expr)
+        if instance is None:
+            return callee.call(self, arguments)
+        return callee.call_method(self, instance, arguments)
+
+    # Evaluates everything a call needs without making it: the callable, the
+    # instance when it is a method looked up on one, and the arguments.
+    def call_target(self, expr):
+        if expr.callee.__class__ is Get:
+            return self.property_target(expr, expr.callee)
         callee = self.evaluate(expr.callee)
         arguments = [self.evaluate(arg) for arg in expr.arguments]
         if not isinstance(callee, LoxCallable):
             raise RuntimeError(expr.paren, "Can only call functions and classes.")
         if len(arguments) != callee.arity():
             raise RuntimeError(expr.paren, f"Expected {callee.arity()} arguments but got {len(arguments)}.")
-        return callee.call(self, arguments)
+        return callee, None, arguments
+
+    def property_target(self, expr, get):
+        obj = self.evaluate(get.object)
+        if not isinstance(obj, LoxInstance):
+            raise RuntimeError(get.name, "Only instances have properties.")
+        if obj.shape is not get.cache_shape:
+            cache_lookup(get, obj, get.name)
+        index = get.cache_index
+        callee = obj.values[index] if index >= 0 else get.cache_method
+        arguments = [self.evaluate(arg) for arg in expr.arguments]
+        if not isinstance(callee, LoxCallable):
+            raise RuntimeError(expr.paren, "Can only call functions and classes.")
+        if len(arguments) != callee.arity():
+            raise RuntimeError(expr.paren, f"Expected {callee.arity()} arguments but got {len(arguments)}.")
+        if index < 0:
+            return callee, obj, arguments
+        return callee, None, arguments
+
+    def defer_call(self, expr):
+        self.tail_call = self.call_target(expr)
+        return TAIL_CALL
 
     def visit_get_expr(self, expr):
         obj = self.evaluate(expr.object)
         if isinstance(obj, LoxInstance):
-            return obj.get(expr.name)
+            if obj.shape is expr.cache_shape:
+                index = expr.cache_index
+                if index >= 0:
+                    return obj.values[index]
+                return expr.cache_method.bind(obj)
+            return cache_get(expr, obj, expr.name)
         raise RuntimeError(expr.name, "Only instances have properties.")
 
     def visit_set_expr(self, expr):
@@ -113,14 +156,19 @@ class Interpreter:
         if not isinstance(obj, LoxInstance):
             raise RuntimeError(expr.name, "Only instances have fields.")
         value = self.evaluate(expr.value)
-        obj.set(expr.name, value)
+        if obj.shape is expr.cache_shape:
+            transition = expr.cache_transition
+            if transition is None:
+                obj.values[expr.cache_index] = value
+            else:
+                obj.shape = transition
+                obj.values.append(value)
+        else:
+            cache_set(expr, obj, expr.name, value)
         return value
 
     def visit_this_expr(self, expr):
-        if expr in self.locals:
-            distance = self.locals[expr]
-            return self.environment.get_at(distance, expr.keyword)
-        return self.environment.get(expr.keyword)
+        return self.environment.get_at(expr.depth, expr.slot)
     
     def visit_logical_expr(self, expr):
         left = self.evaluate(expr.left)
@@ -134,12 +182,12 @@ class Interpreter:
         return self.evaluate(expr.right)
     
     def visit_super_expr(self, expr):
-        superclass = self.environment.get("super")
+        superclass = self.environment.get_at(expr.depth, expr.slot)
         if not isinstance(superclass, LoxClass):
             raise RuntimeError(expr.keyword, "super must be a class.")
-            
-        obj = self.environment.get("this")
-        
+
+        obj = self.environment.get_at(expr.depth - 1, 0)
+
         method = superclass.find_method(expr.method.lexeme)
         if method is None:
             raise RuntimeError(expr.method, f"Undefined property '{expr.method.lexeme}'.")
@@ -149,7 +197,7 @@ class Interpreter:
         value = None
         if stmt.initializer is not None:
             value = self.evaluate(stmt.initializer)
-        self.environment.define(stmt.name, value)
+        self.define(stmt, value)
         return None
 
     def visit_print_stmt(self, stmt):
@@ -162,23 +210,39 @@ class Interpreter:
         return None
 
     def visit_block_stmt(self, stmt):
-        self.execute_block(stmt.statements, Environment(self.environment))
-        return None
+        return self.execute_block(stmt.statements, Environment(self.environment, stmt.slot_count))
 
     def visit_if_stmt(self, stmt):
         condition = self.evaluate(stmt.condition)
-        if condition:
-            self.execute(stmt.then_branch)
+        if self.is_truthy(condition):
+            return self.execute(stmt.then_branch)
         elif stmt.else_branch:
-            self.execute(stmt.else_branch)
+            return self.execute(stmt.else_branch)
+        return None
 
     def visit_while_stmt(self, stmt):
-        while self.evaluate(stmt.condition):
-            self.execute(stmt.body)
+        while self.is_truthy(self.evaluate(stmt.condition)):
+            if self.execute(stmt.body) is RETURN:
+                return RETURN
+        return None
+
+    # Runs the parser, resolver and optimizer passes that lazy mode skipped
+    # over the function's body.
+    def load_function(self, declaration):
+        lazy = declaration.lazy_body
+        declaration.body = lazy.parse()
+        try:
+            Resolver().resume(declaration)
+        except ValueError:
+            declaration.body = None
+            raise
+        if lazy.optimizer is not None:
+            lazy.optimizer.visit_function_stmt(declaration)
+        declaration.lazy_body = None
 
     def visit_function_stmt(self, stmt):
         function = LoxFunction(stmt, self.environment, False)
-        self.environment.define(stmt.name, function)
+        self.define(stmt, function)
         return None
 
     def visit_class_stmt(self, stmt):
@@ -187,10 +251,10 @@ class Interpreter:
             superclass = self.evaluate(stmt.superclass)
             if not isinstance(superclass, LoxClass):
                 raise RuntimeError(stmt.superclass.name, "Superclass must be a class.")
-        self.environment.define(stmt.name, None)
+        self.define(stmt, None)
         if stmt.superclass:
-            self.environment = Environment(self.environment)
-            self.environment.define("super", superclass)
+            self.environment = Environment(self.environment, 1)
+            self.environment.values[0] = superclass
         methods = {}
         for method in stmt.methods:
             function = LoxFunction(method, self.environment, method.name.lexeme == "init")
@@ -198,25 +262,26 @@ class Interpreter:
         klass = LoxClass(stmt.name.lexeme, superclass if isinstance(superclass, LoxClass) else None, methods)
         if stmt.superclass:
             self.environment = self.environment.enclosing
-        self.environment.assign(stmt.name, klass)
+        self.define(stmt, klass)
         return None
     
     def visit_return_stmt(self, stmt):
         value = None
-        if stmt.value is not None:
+        if stmt.tail_call:
+            value = self.defer_call(stmt.value)
+        elif stmt.value is not None:
             value = self.evaluate(stmt.value)
-        raise Return(value)
+        self.return_value = value
+        return RETURN
+
+    def define(self, stmt, value):
+        if stmt.slot is None:
+            self.globals.define(stmt.name, value)
+        else:
+            self.environment.values[stmt.slot] = value
 
     def is_truthy(self, obj):
-        if obj is None:
-            return False
-        if isinstance(obj, bool):
-            return obj
-        return True
+        return is_truthy(obj)
 
     def stringify(self, obj):
-        if obj is None:
-            return "nil"
-        if isinstance(obj, float) and obj.is_integer():
-            return str(int(obj))
-        return str(obj)
+        return stringify(obj)
@@ -1,37 +1,143 @@
+import argparse
 import sys
 from .scanner import Scanner
 from .parser import Parser
+from .resolver import Resolver
+from .optimizer import Optimizer
+from . import cache
+from .profiler import Profiler
 from .interpreter import Interpreter
+from .closure_engine import ClosureInterpreter
+from .vm import VM
+from .transpiler import TranspiledInterpreter
+
+ENGINES = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+    "vm": VM,
+    "python": TranspiledInterpreter,
+}
 
 class Lox:
-    def __init__(self):
-        self.args = sys.argv
-        self.interpreter = Interpreter()
-
-    def main(self):
-        if len(self.args) > 2:
-            print("Usage: python3 -m lox.lox lox/[script]")
-        elif len(self.args) == 2:
-            self.run_file(self.args[1])
+    def __init__(self, engine="tree", disassemble=False, show_python=False, optimize=True, report_optimizations=False, stream=False, use_cache=True, max_frames=None, lazy=False):
+        self.interpreter = ENGINES[engine]()
+        self.use_cache = use_cache
+        self.lazy = lazy
+        self.optimizer = Optimizer() if optimize else None
+        self.report_optimizations = report_optimizations
+        self.stream = stream
+        if disassemble:
+            self.interpreter.disassemble = True
+        if show_python:
+            self.interpreter.show_source = True
+        if max_frames is not None:
+            self.interpreter.max_frames = max_frames
+
+    def main(self, script=None):
+        if script:
+            self.run_file(script)
+            if self.optimizer is not None and self.report_optimizations:
+                for line in self.optimizer.report():
+                    print(f"optimizer: {line}", file=sys.stderr)
         else:
             self.run_prompt()
 
     def run_file(self, path):
-        file = open(path)
-        self.run(file.read())
+        with open(path) as file:
+            source = file.read()
+        if not self.use_cache or self.stream or self.lazy:
+            self.run(source)
+            return
+        statements = cache.load(path, source)
+        if statements is None:
+            statements = self.parse(source)
+            cache.store(path, source, statements)
+        self.execute(statements)
 
     def run_prompt(self):
         while True:
             prompt = input("py-lox> ")
             self.run(prompt)
-    
+
     def run(self, source):
-        scanner = Scanner(source)
-        tokens = scanner.scan_tokens()
+        if self.stream:
+            parser = Parser(Scanner(source).scan())
+            resolver = Resolver()
+            for stmt in parser.declarations():
+                resolver.resolve_stmts([stmt])
+                self.execute([stmt])
+        else:
+            self.execute(self.parse(source))
 
-        parser = Parser(tokens)
+    def parse(self, source):
+        scanner = Scanner(source)
+        if self.lazy:
+            parser = Parser(scanner.scan_buffer(), lazy=True)
+        else:
+            parser = Parser(scanner.scan())
         statements = parser.parse()
+
+        resolver = Resolver()
+        resolver.resolve_stmts(statements)
+        return statements
+
+    def execute(self, statements):
+        if self.optimizer is not None:
+            statements = self.optimizer.optimize(statements)
         self.interpreter.interpret(statements)
 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python3 -m lox.lox", usage="python3 -m lox.lox [options] lox/[script]")
+    parser.add_argument("script", nargs="?")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="tree")
+    parser.add_argument("--disassemble", action="store_true", help="print the compiled bytecode (vm engine only)")
+    parser.add_argument("--show-python", action="store_true", help="print the generated Python source (python engine only)")
+    parser.add_argument("--max-frames", type=int, metavar="N", help="maximum Lox call depth (vm engine only)")
+    parser.add_argument("--stream", action="store_true", help="parse and run one top-level declaration at a time")
+    parser.add_argument("--lazy", action="store_true", help="parse and resolve top-level function and method bodies on first call (tree and closure engines)")
+    parser.add_argument("--no-cache", action="store_true", help=f"don't read or write compiled programs in {cache.CACHE_DIR}/")
+    parser.add_argument("--clear-cache", action="store_true", help=f"delete the script's compiled program from {cache.CACHE_DIR}/ first")
+    parser.add_argument("--profile", action="store_true", help="print per-function call counts and times to stderr (tree and closure engines)")
+    parser.add_argument("--profile-collapsed", metavar="PATH", help="write collapsed stacks for flamegraph tools (implies --profile)")
+    parser.add_argument("--no-optimize", action="store_true", help="skip constant folding and dead-code elimination")
+    parser.add_argument("--report-optimizations", action="store_true", help="print what the optimizer changed to stderr")
+    options = parser.parse_args(argv)
+    if options.disassemble and options.engine != "vm":
+        parser.error("--disassemble requires --engine=vm")
+    if options.show_python and options.engine != "python":
+        parser.error("--show-python requires --engine=python")
+    if options.max_frames is not None and options.engine != "vm":
+        parser.error("--max-frames requires --engine=vm")
+    if options.max_frames is not None and options.max_frames < 1:
+        parser.error("--max-frames must be at least 1")
+    if options.report_optimizations and options.no_optimize:
+        parser.error("--report-optimizations can't be combined with --no-optimize")
+    if (options.profile or options.profile_collapsed) and options.engine not in ("tree", "closure"):
+        parser.error("--profile requires --engine=tree or --engine=closure")
+    if options.lazy and options.engine not in ("tree", "closure"):
+        parser.error("--lazy requires --engine=tree or --engine=closure")
+    if options.lazy and options.stream:
+        parser.error("--lazy can't be combined with --stream")
+    if options.clear_cache and not options.script:
+        parser.error("--clear-cache requires a script")
+    return options
+
 if __name__ == "__main__":
-    Lox().main()
\ No newline at end of file
+    options = parse_args(sys.argv[1:])
+    if options.clear_cache:
+        cache.clear(options.script)
+    profiler = None
+    if options.profile or options.profile_collapsed:
+        profiler = Profiler()
+        profiler.install()
+    try:
+        Lox(options.engine, options.disassemble, options.show_python,
+            not options.no_optimize, options.report_optimizations, options.stream,
+            not options.no_cache, options.max_frames, options.lazy).main(options.script)
+    finally:
+        if profiler is not None:
+            profiler.uninstall()
+            print(profiler.report(), file=sys.stderr)
+            if options.profile_collapsed:
+                with open(options.profile_collapsed, "w") as file:
+                    file.write(profiler.collapsed_stacks())
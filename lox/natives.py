@@ -0,0 +1,192 @@
+import math
+import time
+from .objects import LoxCallable, LoxList
+from .operators import Rope, stringify
+
+# A host function callable from Lox. Calls go straight to the Python function:
+# no Environment is created and no Lox frame is pushed.
+class NativeFunction(LoxCallable):
+    def __init__(self, name, arity, function):
+        self.name = name
+        self.argument_count = arity
+        self.function = function
+
+    def arity(self):
+        return self.argument_count
+
+    def call(self, interpreter, arguments):
+        return self.function(*arguments)
+
+    # The python engine calls Lox values directly, checking `lox_arity` first.
+    @property
+    def lox_arity(self):
+        return self.argument_count
+
+    def __call__(self, *arguments):
+        return self.function(*arguments)
+
+    def __str__(self):
+        return "<native fn>"
+
+def number(value):
+    if value.__class__ is not float:
+        raise RuntimeError("Argument must be a number.")
+    return value
+
+def string(value):
+    if value.__class__ is str:
+        return value
+    if value.__class__ is Rope:
+        return str(value)
+    raise RuntimeError("Argument must be a string.")
+
+def lox_list(value):
+    if value.__class__ is not LoxList:
+        raise RuntimeError("Argument must be a list.")
+    return value.elements
+
+def index(value):
+    if value.__class__ is not float or not value.is_integer():
+        raise RuntimeError("Index must be an integer.")
+    return int(value)
+
+def clock():
+    return time.time()
+
+# Out-of-domain and overflowing results follow IEEE 754 instead of raising.
+def unary_math(function):
+    def native(x):
+        try:
+            return float(function(number(x)))
+        except ValueError:
+            return math.nan
+        except OverflowError:
+            return math.inf
+    return native
+
+def binary_math(function):
+    def native(x, y):
+        try:
+            return float(function(number(x), number(y)))
+        except ValueError:
+            return math.nan
+        except OverflowError:
+            return math.inf
+    return native
+
+def lox_round(x):
+    return float(math.floor(number(x) + 0.5))
+
+def length(value):
+    if value.__class__ is LoxList:
+        return float(len(value.elements))
+    return float(len(string(value)))
+
+def substring(s, start, end):
+    s = string(s)
+    start = index(start)
+    end = index(end)
+    if not 0 <= start <= end <= len(s):
+        raise RuntimeError("Substring bounds out of range.")
+    return s[start:end]
+
+def index_of(s, needle):
+    return float(string(s).find(string(needle)))
+
+def parse_number(s):
+    try:
+        value = float(string(s))
+    except ValueError:
+        return None
+    return value if math.isfinite(value) else None
+
+def format_number(x, digits):
+    return f"{number(x):.{index(digits)}f}"
+
+def new_list():
+    return LoxList([])
+
+def element_index(elements, i):
+    i = index(i)
+    if not 0 <= i < len(elements):
+        raise RuntimeError("List index out of range.")
+    return i
+
+def append(items, value):
+    lox_list(items).append(value)
+
+def get(items, i):
+    elements = lox_list(items)
+    return elements[element_index(elements, i)]
+
+def set_(items, i, value):
+    elements = lox_list(items)
+    elements[element_index(elements, i)] = value
+    return value
+
+def pop(items):
+    elements = lox_list(items)
+    if not elements:
+        raise RuntimeError("Can't pop from an empty list.")
+    return elements.pop()
+
+def slice_(items, start, end):
+    elements = lox_list(items)
+    start = index(start)
+    end = index(end)
+    if not 0 <= start <= end <= len(elements):
+        raise RuntimeError("Slice bounds out of range.")
+    return LoxList(elements[start:end])
+
+def extend(items, other):
+    lox_list(items).extend(lox_list(other))
+
+def reverse(items):
+    lox_list(items).reverse()
+
+def sort(items):
+    elements = lox_list(items)
+    kinds = set(map(type, elements))
+    if Rope in kinds:
+        elements[:] = [str(element) if element.__class__ is Rope else element for element in elements]
+        kinds = set(map(type, elements))
+    if len(kinds) > 1 or kinds - {float, str}:
+        raise RuntimeError("Can only sort a list of numbers or a list of strings.")
+    elements.sort()
+
+def join(items, separator):
+    return string(separator).join(map(stringify, lox_list(items)))
+
+STANDARD_LIBRARY = [
+    ("clock", 0, clock),
+    ("abs", 1, unary_math(abs)),
+    ("floor", 1, unary_math(math.floor)),
+    ("ceil", 1, unary_math(math.ceil)),
+    ("round", 1, lox_round),
+    ("sqrt", 1, unary_math(math.sqrt)),
+    ("exp", 1, unary_math(math.exp)),
+    ("log", 1, unary_math(math.log)),
+    ("sin", 1, unary_math(math.sin)),
+    ("cos", 1, unary_math(math.cos)),
+    ("tan", 1, unary_math(math.tan)),
+    ("atan2", 2, binary_math(math.atan2)),
+    ("pow", 2, binary_math(math.pow)),
+    ("min", 2, binary_math(min)),
+    ("max", 2, binary_math(max)),
+    ("len", 1, length),
+    ("substring", 3, substring),
+    ("indexOf", 2, index_of),
+    ("parseNumber", 1, parse_number),
+    ("formatNumber", 2, format_number),
+    ("toString", 1, stringify),
+    ("list", 0, new_list),
+    ("append", 2, append),
+    ("get", 2, get),
+    ("set", 3, set_),
+    ("pop", 1, pop),
+    ("slice", 3, slice_),
+    ("extend", 2, extend),
+    ("reverse", 1, reverse),
+    ("sort", 1, sort),
+    ("join", 2, join),
+]
@@ -1,4 +1,15 @@
-from .environment import * 
+from .environment import *
+from .stmt import Return as ReturnStmt
+from .operators import stringify
+
+# Completion value returned by statement execution after a `return` ran. The
+# returned value itself is left in `interpreter.return_value`.
+RETURN = object()
+
+# Value produced by a `return f(...)` in tail position. The call itself is left
+# in `interpreter.tail_call` for the caller's trampoline to make, so a chain of
+# tail calls runs in constant Python stack space.
+TAIL_CALL = object()
 
 class LoxCallable:
     def arity(self):
@@ -10,26 +21,35 @@ class LoxClass(LoxCallable):
     def __init__(self, name, superclass, methods):
         self.name = name
         self.superclass = superclass
-        self.methods = methods
+        # Methods are flattened: the table holds inherited methods too, so a
+        # lookup never walks the superclass chain.
+        self.methods = dict(superclass.methods) if superclass else {}
+        self.methods.update(methods)
+        self.initializer = self.methods.get("init")
+        self.shape = Shape(self, {})
+
+    def inherit(self, superclass):
+        self.superclass = superclass
+        self.methods = dict(superclass.methods, **self.methods)
+        self.initializer = self.methods.get("init")
+
+    def add_method(self, name, method):
+        self.methods[name] = method
+        if name == "init":
+            self.initializer = method
 
     def find_method(self, name):
-        if name in self.methods:
-            return self.methods[name]
-        if self.superclass:
-            return self.superclass.find_method(name)
-        return None
+        return self.methods.get(name)
 
     def arity(self):
-        initializer = self.find_method("init")
-        if initializer:
-            return initializer.arity()
+        if self.initializer:
+            return self.initializer.arity()
         return 0
 
     def call(self, interpreter, arguments):
         instance = LoxInstance(self)
-        initializer = self.find_method("init")
-        if initializer:
-            initializer.bind(instance).call(interpreter, arguments)
+        if self.initializer:
+            self.initializer.call_method(interpreter, instance, arguments)
         return instance
 
     def __str__(self):
@@ -40,51 +60,199 @@ class LoxFunction(LoxCallable):
         self.declaration = declaration
         self.closure = closure
         self.is_initializer = is_initializer
+        # None until a lazily parsed body has been loaded.
+        self.slot_count = declaration.slot_count if declaration.body is not None else None
 
     def bind(self, instance):
-        env = Environment(self.closure)
-        env.define("this", instance)
-        return LoxFunction(self.declaration, env, self.is_initializer)
+        return LoxBoundMethod(instance, self)
 
     def arity(self):
         return len(self.declaration.params)
 
     def call(self, interpreter, arguments):
-        environment = Environment(self.closure)
-        for i, param in enumerate(self.declaration.params):
-            environment.define(param, arguments[i])
-        try:
-            interpreter.execute_block(self.declaration.body, environment)
-        except Return as r:
-            if self.is_initializer:
-                return self.closure.get_at(0, "this")
-            return r.value
+        value = self.enter_tail(interpreter, None, arguments)
+        if value is TAIL_CALL:
+            return complete_tail_calls(interpreter)
+        return value
+
+    def call_method(self, interpreter, instance, arguments):
+        value = self.enter_tail(interpreter, instance, arguments)
         if self.is_initializer:
-            return self.closure.get_at(0, "this")
-        return None
+            return instance
+        if value is TAIL_CALL:
+            return complete_tail_calls(interpreter)
+        return value
+
+    # One activation, trampolined ones included; may return TAIL_CALL. Methods
+    # keep `this` in slot 0 of their own environment, followed by the
+    # parameters, so calling one needs no environment for the binding.
+    def enter_tail(self, interpreter, receiver, arguments):
+        if self.slot_count is None:
+            self.load(interpreter)
+        environment = Environment(self.closure, self.slot_count)
+        values = environment.values
+        if receiver is None:
+            values[:len(arguments)] = arguments
+        else:
+            values[0] = receiver
+            values[1:len(arguments) + 1] = arguments
+        return self.run(interpreter, environment)
+
+    def load(self, interpreter):
+        if self.declaration.body is None:
+            interpreter.load_function(self.declaration)
+        self.slot_count = self.declaration.slot_count
+
+    def run(self, interpreter, environment):
+        value = None
+        visitors = interpreter.visitors
+        previous = interpreter.environment
+        interpreter.environment = environment
+        try:
+            for stmt in self.declaration.body:
+                if stmt.__class__ is ReturnStmt:
+                    if stmt.tail_call:
+                        value = interpreter.defer_call(stmt.value)
+                    elif stmt.value is not None:
+                        value = visitors[stmt.value.kind](stmt.value)
+                    break
+                if visitors[stmt.kind](stmt) is RETURN:
+                    value = interpreter.return_value
+                    break
+        finally:
+            interpreter.environment = previous
+        return value
+
+def complete_tail_calls(interpreter):
+    value = TAIL_CALL
+    while value is TAIL_CALL:
+        function, instance, arguments = interpreter.tail_call
+        if function.__class__ is LoxBoundMethod:
+            function, instance = function.method, function.receiver
+        if not isinstance(function, LoxFunction) or function.is_initializer:
+            if instance is None:
+                return function.call(interpreter, arguments)
+            return function.call_method(interpreter, instance, arguments)
+        value = function.enter_tail(interpreter, instance, arguments)
+    return value
+
+class LoxBoundMethod(LoxCallable):
+    def __init__(self, receiver, method):
+        self.receiver = receiver
+        self.method = method
+
+    def arity(self):
+        return self.method.arity()
+
+    def call(self, interpreter, arguments):
+        return self.method.call_method(interpreter, self.receiver, arguments)
+
+class Shape:
+    __slots__ = ("klass", "fields", "transitions")
+
+    def __init__(self, klass, fields):
+        self.klass = klass
+        self.fields = fields
+        self.transitions = {}
+
+    def with_field(self, name):
+        shape = self.transitions.get(name)
+        if shape is None:
+            fields = dict(self.fields)
+            fields[name] = len(fields)
+            shape = Shape(self.klass, fields)
+            self.transitions[name] = shape
+        return shape
 
 class LoxInstance:
+    __slots__ = ("klass", "shape", "values")
+
     def __init__(self, klass):
         self.klass = klass
-        self.fields = {}
+        self.shape = klass.shape
+        self.values = []
 
     def get(self, name):
-        key = name.lexeme if hasattr(name, "lexeme") else name
-        if key in self.fields:
-            return self.fields[key]
-        method = self.klass.find_method(key)
+        index = self.shape.fields.get(name)
+        if index is not None:
+            return self.values[index]
+        method = self.klass.find_method(name)
         if method:
             return method.bind(self)
-        raise RuntimeError(name, f"Undefined property '{key}'.")
+        raise RuntimeError(f"Undefined property '{name}'.")
 
     def set(self, name, value):
-        key = name.lexeme if hasattr(name, "lexeme") else name
-        self.fields[key] = value
+        index = self.shape.fields.get(name)
+        if index is None:
+            self.shape = self.shape.with_field(name)
+            self.values.append(value)
+        else:
+            self.values[index] = value
 
     def __str__(self):
         return f"{self.klass.name} instance"
 
-class Return(Exception):
-    def __init__(self, value):
-        super().__init__()
-        self.value = value
\ No newline at end of file
+# Built-in list. Like instances, lists are compared by identity.
+class LoxList:
+    __slots__ = ("elements",)
+
+    def __init__(self, elements):
+        self.elements = elements
+
+    def __str__(self):
+        return "[" + ", ".join(map(stringify, self.elements)) + "]"
+
+# Inline caches. A property site (a Get or Set node) remembers the last shape
+# it saw in cache_shape and up to POLYMORPHIC_LIMIT others in cache_entries.
+# Engines test `instance.shape is site.cache_shape` inline and only call the
+# functions below on a miss.
+POLYMORPHIC_LIMIT = 4
+
+def cache_lookup(site, instance, token):
+    name = token.lexeme
+    shape = instance.shape
+    entries = site.cache_entries
+    entry = entries.get(shape) if entries is not None else None
+    if entry is None:
+        index = shape.fields.get(name, -1)
+        method = None
+        if index < 0:
+            method = shape.klass.find_method(name)
+            if method is None:
+                raise RuntimeError(token, f"Undefined property '{name}'.")
+        entry = (index, method)
+        if entries is None:
+            site.cache_entries = entries = {}
+        if len(entries) < POLYMORPHIC_LIMIT:
+            entries[shape] = entry
+    site.cache_shape = shape
+    site.cache_index, site.cache_method = entry
+
+def cache_get(site, instance, token):
+    cache_lookup(site, instance, token)
+    if site.cache_index >= 0:
+        return instance.values[site.cache_index]
+    return site.cache_method.bind(instance)
+
+def cache_set(site, instance, token, value):
+    name = token.lexeme
+    shape = instance.shape
+    entries = site.cache_entries
+    entry = entries.get(shape) if entries is not None else None
+    if entry is None:
+        index = shape.fields.get(name)
+        if index is None:
+            entry = (len(shape.fields), shape.with_field(name))
+        else:
+            entry = (index, None)
+        if entries is None:
+            site.cache_entries = entries = {}
+        if len(entries) < POLYMORPHIC_LIMIT:
+            entries[shape] = entry
+    site.cache_shape = shape
+    site.cache_index, site.cache_transition = entry
+    if entry[1] is None:
+        instance.values[entry[0]] = value
+    else:
+        instance.shape = entry[1]
+        instance.values.append(value)
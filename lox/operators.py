@@ -0,0 +1,114 @@
+import operator
+from .token_type import TokenType
+
+def is_truthy(obj):
+    if obj is None:
+        return False
+    if isinstance(obj, bool):
+        return obj
+    return True
+
+def stringify(obj):
+    if obj is None:
+        return "nil"
+    if isinstance(obj, float) and obj.is_integer():
+        return str(int(obj))
+    return str(obj)
+
+# Concatenations that reach ROPE_THRESHOLD characters produce a Rope, a lazy
+# string that appends in amortized O(1) and is joined only when its text is
+# needed. Ropes made by appending to the same rope share one parts list; each
+# sees the first `count` parts, so only appending to an older rope copies.
+ROPE_THRESHOLD = 256
+
+class Rope:
+    __slots__ = ("parts", "count", "flat")
+
+    def __init__(self, parts):
+        self.parts = parts
+        self.count = len(parts)
+        self.flat = None
+
+    def append(self, piece):
+        parts = self.parts
+        if self.count != len(parts):
+            parts = parts[:self.count]
+        parts.append(piece)
+        return Rope(parts)
+
+    def __str__(self):
+        if self.flat is None:
+            parts = self.parts
+            self.flat = "".join(parts if self.count == len(parts) else parts[:self.count])
+        return self.flat
+
+    def __eq__(self, other):
+        if other.__class__ is Rope or other.__class__ is str:
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        if other.__class__ is Rope or other.__class__ is str:
+            return str(self) != str(other)
+        return NotImplemented
+
+    def __lt__(self, other):
+        return str(self) < str(other) if other.__class__ is Rope or other.__class__ is str else NotImplemented
+
+    def __le__(self, other):
+        return str(self) <= str(other) if other.__class__ is Rope or other.__class__ is str else NotImplemented
+
+    def __gt__(self, other):
+        return str(self) > str(other) if other.__class__ is Rope or other.__class__ is str else NotImplemented
+
+    def __ge__(self, other):
+        return str(self) >= str(other) if other.__class__ is Rope or other.__class__ is str else NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+def concatenate(left, right):
+    if left.__class__ is Rope:
+        return left.append(stringify(right))
+    text = stringify(left) + stringify(right)
+    return Rope([text]) if len(text) >= ROPE_THRESHOLD else text
+
+def add(left, right):
+    if left.__class__ is float and right.__class__ is float:
+        return left + right
+    if isinstance(left, (str, Rope)) or isinstance(right, (str, Rope)):
+        return concatenate(left, right)
+    return left + right
+
+def logical_not(right):
+    return not is_truthy(right)
+
+BINARY_OPERATORS = {
+    TokenType.PLUS: add,
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+    TokenType.SLASH: operator.truediv,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.EQUAL_EQUAL: operator.eq,
+    TokenType.BANG_EQUAL: operator.ne,
+}
+
+UNARY_OPERATORS = {
+    TokenType.MINUS: operator.neg,
+    TokenType.BANG: logical_not,
+}
+
+def binary_handler(token):
+    handler = BINARY_OPERATORS.get(token.token_type)
+    if handler is None:
+        raise RuntimeError(f"Unknown binary operator {token.token_type}")
+    return handler
+
+def unary_handler(token):
+    handler = UNARY_OPERATORS.get(token.token_type)
+    if handler is None:
+        raise RuntimeError(f"Unknown unary operator {token.token_type}")
+    return handler
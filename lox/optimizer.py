@@ -0,0 +1,181 @@
+from .token_type import TokenType
+from .expr import *
+from .stmt import *
+from .operators import BINARY_OPERATORS, is_truthy
+
+def is_number(value):
+    return isinstance(value, float)
+
+# Runs after the resolver, so static errors in dead code are still reported
+# and the depth/slot annotations on surviving nodes stay valid. Only folds
+# what every engine evaluates the same way: mixed string/number `+`,
+# division by zero and type errors are left for the runtime to report.
+class Optimizer(Expr.Visitor, Stmt.Visitor):
+    def __init__(self):
+        self.changes = {
+            "constant expressions folded": 0,
+            "dead branches removed": 0,
+            "dead loops removed": 0,
+            "unreachable statements removed": 0,
+        }
+
+    def optimize(self, statements):
+        return self.optimize_stmts(statements)
+
+    def report(self):
+        return [f"{count} {change}" for change, count in self.changes.items() if count]
+
+    def optimize_stmts(self, statements):
+        optimized = []
+        for index, stmt in enumerate(statements):
+            stmt = stmt.accept(self)
+            if stmt is None:
+                continue
+            optimized.append(stmt)
+            if isinstance(stmt, Return):
+                self.changes["unreachable statements removed"] += len(statements) - index - 1
+                break
+        return optimized
+
+    def optimize_branch(self, stmt):
+        stmt = stmt.accept(self)
+        return Block([]) if stmt is None else stmt
+
+    def fold(self, value):
+        self.changes["constant expressions folded"] += 1
+        return Literal(value)
+
+    def visit_block_stmt(self, stmt):
+        stmt.statements = self.optimize_stmts(stmt.statements)
+        return stmt
+
+    def visit_class_stmt(self, stmt):
+        for method in stmt.methods:
+            method.accept(self)
+        return stmt
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression = stmt.expression.accept(self)
+        return stmt
+
+    def visit_function_stmt(self, stmt):
+        if stmt.body is None:
+            stmt.lazy_body.optimizer = self
+            return stmt
+        stmt.body = self.optimize_stmts(stmt.body)
+        return stmt
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition = stmt.condition.accept(self)
+        if isinstance(stmt.condition, Literal):
+            self.changes["dead branches removed"] += 1
+            if is_truthy(stmt.condition.value):
+                return stmt.then_branch.accept(self)
+            if stmt.else_branch is not None:
+                return stmt.else_branch.accept(self)
+            return None
+        stmt.then_branch = self.optimize_branch(stmt.then_branch)
+        if stmt.else_branch is not None:
+            stmt.else_branch = self.optimize_branch(stmt.else_branch)
+        return stmt
+
+    def visit_print_stmt(self, stmt):
+        stmt.expression = stmt.expression.accept(self)
+        return stmt
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is not None:
+            stmt.value = stmt.value.accept(self)
+        return stmt
+
+    def visit_var_stmt(self, stmt):
+        if stmt.initializer is not None:
+            stmt.initializer = stmt.initializer.accept(self)
+        return stmt
+
+    def visit_while_stmt(self, stmt):
+        stmt.condition = stmt.condition.accept(self)
+        if isinstance(stmt.condition, Literal) and not is_truthy(stmt.condition.value):
+            self.changes["dead loops removed"] += 1
+            return None
+        stmt.body = self.optimize_branch(stmt.body)
+        return stmt
+
+    def visit_assign_expr(self, expr):
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_binary_expr(self, expr):
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+        if not (isinstance(expr.left, Literal) and isinstance(expr.right, Literal)):
+            return expr
+        left = expr.left.value
+        right = expr.right.value
+        t = expr.operator.token_type
+        if t == TokenType.EQUAL_EQUAL or t == TokenType.BANG_EQUAL:
+            if type(left) is not type(right) and left is not None and right is not None:
+                return expr
+            return self.fold((left == right) == (t == TokenType.EQUAL_EQUAL))
+        if t == TokenType.PLUS and isinstance(left, str) and isinstance(right, str):
+            return self.fold(left + right)
+        if not (is_number(left) and is_number(right)):
+            return expr
+        if t == TokenType.SLASH and right == 0:
+            return expr
+        return self.fold(BINARY_OPERATORS[t](left, right))
+
+    def visit_call_expr(self, expr):
+        expr.callee = expr.callee.accept(self)
+        expr.arguments = [arg.accept(self) for arg in expr.arguments]
+        return expr
+
+    def visit_get_expr(self, expr):
+        expr.object = expr.object.accept(self)
+        return expr
+
+    def visit_grouping_expr(self, expr):
+        expr.expression = expr.expression.accept(self)
+        if isinstance(expr.expression, Literal):
+            return expr.expression
+        return expr
+
+    def visit_literal_expr(self, expr):
+        return expr
+
+    def visit_logical_expr(self, expr):
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+        if not isinstance(expr.left, Literal):
+            return expr
+        self.changes["constant expressions folded"] += 1
+        truthy = is_truthy(expr.left.value)
+        if expr.operator.token_type == TokenType.OR:
+            return expr.left if truthy else expr.right
+        return expr.right if truthy else expr.left
+
+    def visit_set_expr(self, expr):
+        expr.object = expr.object.accept(self)
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_super_expr(self, expr):
+        return expr
+
+    def visit_this_expr(self, expr):
+        return expr
+
+    def visit_unary_expr(self, expr):
+        expr.right = expr.right.accept(self)
+        if not isinstance(expr.right, Literal):
+            return expr
+        value = expr.right.value
+        t = expr.operator.token_type
+        if t == TokenType.BANG:
+            return self.fold(not is_truthy(value))
+        if t == TokenType.MINUS and is_number(value):
+            return self.fold(-value)
+        return expr
+
+    def visit_variable_expr(self, expr):
+        return expr
@@ -7,17 +7,30 @@ class Parser:
     class ParseError(RuntimeError):
         pass
 
-    def __init__(self, tokens):
-        self.tokens = tokens
-        self.current = 0
+    # `tokens` may be a list or a lazy iterator such as Scanner.scan(); the
+    # parser only ever holds the current and previous token. With `lazy`,
+    # `tokens` must be a TokenBuffer, and the bodies of functions and methods
+    # declared outside any block are skipped: see LazyBody.
+    def __init__(self, tokens, lazy=False):
+        self.buffer = tokens if lazy else None
+        self.position = 0
+        self.nesting = 0
+        self.tokens = self.read(0) if lazy else iter(tokens)
+        self.current_token = next(self.tokens)
+        self.previous_token = None
+
+    def read(self, index):
+        for self.position, token in enumerate(self.buffer.iter_from(index), index):
+            yield token
 
     def parse(self):
-        statements = []
+        return list(self.declarations())
+
+    def declarations(self):
         while not self.is_at_end():
             stmt = self.declaration()
             if stmt is not None:
-                statements.append(stmt)
-        return statements
+                yield stmt
 
     def declaration(self):
         try:
@@ -145,98 +158,89 @@ class Parser:
                     break
         self.consume(TokenType.RIGHT_PAREN, "Expect ')' after parameters.")
         self.consume(TokenType.LEFT_BRACE, f"Expect '{{' before {kind} body.")
+        if self.buffer is not None and not self.nesting:
+            start = self.position - 1
+            end = self.buffer.match_brace(start)
+            if end is not None:
+                self.skip_to(end)
+                function = Function(name, parameters, None)
+                function.lazy_body = LazyBody(self.buffer, start)
+                return function
         body = self.block()
         return Function(name, parameters, body)
 
     def block(self):
         statements = []
+        self.nesting += 1
         while not self.check(TokenType.RIGHT_BRACE) and not self.is_at_end():
             statements.append(self.declaration())
+        self.nesting -= 1
         self.consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
         return statements
 
+    # Continues after the token at `index`, which becomes the previous token.
+    def skip_to(self, index):
+        self.tokens = self.read(index + 1)
+        self.previous_token = self.buffer[index]
+        self.current_token = next(self.tokens)
+
+    # Expressions are parsed by precedence climbing over RULES, which maps a
+    # token type to how it starts an expression (prefix), how it continues
+    # one (infix) and how tightly the infix form binds.
     def expression(self):
-        return self.assignment()
+        return self.parse_precedence(ASSIGNMENT)
 
-    def assignment(self):
-        expr = self.or_()
-        if self.match(TokenType.EQUAL):
-            value = self.assignment()
-            if isinstance(expr, Variable):
-                name = expr.name
-                return Assign(name, value)
-            elif isinstance(expr, Get):
-                return Set(expr.object, expr.name, value)
-        return expr
-
-    def or_(self):
-        expr = self.and_()
-        while self.match(TokenType.OR):
-            operator = self.previous()
-            right = self.and_()
-            expr = Logical(expr, operator, right)
-        return expr
-
-    def and_(self):
-        expr = self.equality()
-        while self.match(TokenType.AND):
-            operator = self.previous()
-            right = self.equality()
-            expr = Logical(expr, operator, right)
-        return expr
-
-    def equality(self):
-        expr = self.comparison()
-        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.previous()
-            right = self.comparison()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def comparison(self):
-        expr = self.term()
-        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = self.previous()
-            right = self.term()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def term(self):
-        expr = self.factor()
-        while self.match(TokenType.MINUS, TokenType.PLUS):
-            operator = self.previous()
-            right = self.factor()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def factor(self):
-        expr = self.unary()
-        while self.match(TokenType.SLASH, TokenType.STAR):
-            operator = self.previous()
-            right = self.unary()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def unary(self):
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator = self.previous()
-            right = self.unary()
-            return Unary(operator, right)
-        return self.call()
-
-    def call(self):
-        expr = self.primary()
+    def parse_precedence(self, precedence):
+        prefix = RULES.get(self.current_token.token_type, NO_RULE)[0]
+        if prefix is None:
+            return None
+        expr = prefix(self, self.advance())
         while True:
-            if self.match(TokenType.LEFT_PAREN):
-                expr = self.finish_call(expr)
-            elif self.match(TokenType.DOT):
-                name = self.consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
-                expr = Get(expr, name)
-            else:
-                break
-        return expr
-
-    def finish_call(self, callee):
+            infix, infix_precedence = RULES.get(self.current_token.token_type, NO_RULE)[1:]
+            if infix is None or infix_precedence < precedence:
+                return expr
+            expr = infix(self, expr, self.advance())
+
+    def literal(self, token):
+        return Literal(token.literal)
+
+    def keyword_literal(self, token):
+        return Literal(KEYWORD_LITERALS[token.token_type])
+
+    def grouping(self, token):
+        expr = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+        return Grouping(expr)
+
+    def variable(self, token):
+        return Variable(token)
+
+    def this(self, token):
+        return This(token)
+
+    def super_(self, token):
+        self.consume(TokenType.DOT, "Expect '.' after 'super'.")
+        method = self.consume(TokenType.IDENTIFIER, "Expect superclass method name.")
+        return Super(token, method)
+
+    def unary(self, operator):
+        return Unary(operator, self.parse_precedence(UNARY))
+
+    def binary(self, left, operator):
+        return Binary(left, operator, self.parse_precedence(RULES[operator.token_type][2] + 1))
+
+    def logical(self, left, operator):
+        return Logical(left, operator, self.parse_precedence(RULES[operator.token_type][2] + 1))
+
+    def assignment(self, target, equals):
+        value = self.parse_precedence(ASSIGNMENT)
+        if isinstance(target, Variable):
+            return Assign(target.name, value)
+        elif isinstance(target, Get):
+            return Set(target.object, target.name, value)
+        return target
+
+    def finish_call(self, callee, paren):
         arguments = []
         if not self.check(TokenType.RIGHT_PAREN):
             while True:
@@ -246,28 +250,9 @@ class Parser:
         paren = self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
         return Call(callee, paren, arguments)
 
-    def primary(self):
-        if self.match(TokenType.FALSE):
-            return Literal(False)
-        if self.match(TokenType.TRUE):
-            return Literal(True)
-        if self.match(TokenType.NIL):
-            return Literal(None)
-        if self.match(TokenType.NUMBER, TokenType.STRING):
-            return Literal(self.previous().literal)
-        if self.match(TokenType.SUPER):
-            keyword = self.previous()
-            self.consume(TokenType.DOT, "Expect '.' after 'super'.")
-            method = self.consume(TokenType.IDENTIFIER, "Expect superclass method name.")
-            return Super(keyword, method)
-        if self.match(TokenType.THIS):
-            return This(self.previous())
-        if self.match(TokenType.IDENTIFIER):
-            return Variable(self.previous())
-        if self.match(TokenType.LEFT_PAREN):
-            expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return Grouping(expr)
+    def get(self, obj, dot):
+        name = self.consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
+        return Get(obj, name)
 
     def match(self, *types):
         for t in types:
@@ -287,17 +272,18 @@ class Parser:
 
     def advance(self):
         if not self.is_at_end():
-            self.current += 1
-        return self.previous()
+            self.previous_token = self.current_token
+            self.current_token = next(self.tokens)
+        return self.previous_token
 
     def is_at_end(self):
-        return self.peek().token_type == TokenType.EOF
+        return self.current_token.token_type == TokenType.EOF
 
     def peek(self):
-        return self.tokens[self.current]
+        return self.current_token
 
     def previous(self):
-        return self.tokens[self.current - 1]
+        return self.previous_token
 
     def synchronize(self):
         self.advance()
@@ -307,3 +293,52 @@ class Parser:
             if self.peek().token_type in (TokenType.CLASS, TokenType.FUN, TokenType.VAR, TokenType.FOR, TokenType.IF, TokenType.WHILE, TokenType.PRINT, TokenType.RETURN):
                 return
             self.advance()
+
+# A function body the parser skipped in lazy mode: the token range from its
+# '{' to the matching '}'. The resolver and optimizer leave what they need to
+# finish the job in `context` and `optimizer`, and the interpreter runs all
+# three passes over the body the first time the function is called.
+class LazyBody:
+    __slots__ = ("buffer", "start", "context", "optimizer")
+
+    def __init__(self, buffer, start):
+        self.buffer = buffer
+        self.start = start
+        self.context = None
+        self.optimizer = None
+
+    def parse(self):
+        return Parser(self.buffer.iter_from(self.start + 1)).block()
+
+ASSIGNMENT, OR, AND, EQUALITY, COMPARISON, TERM, FACTOR, UNARY, CALL = range(1, 10)
+
+KEYWORD_LITERALS = {TokenType.FALSE: False, TokenType.TRUE: True, TokenType.NIL: None}
+
+NO_RULE = (None, None, 0)
+
+RULES = {
+    TokenType.LEFT_PAREN: (Parser.grouping, Parser.finish_call, CALL),
+    TokenType.DOT: (None, Parser.get, CALL),
+    TokenType.MINUS: (Parser.unary, Parser.binary, TERM),
+    TokenType.PLUS: (None, Parser.binary, TERM),
+    TokenType.SLASH: (None, Parser.binary, FACTOR),
+    TokenType.STAR: (None, Parser.binary, FACTOR),
+    TokenType.BANG: (Parser.unary, None, 0),
+    TokenType.BANG_EQUAL: (None, Parser.binary, EQUALITY),
+    TokenType.EQUAL: (None, Parser.assignment, ASSIGNMENT),
+    TokenType.EQUAL_EQUAL: (None, Parser.binary, EQUALITY),
+    TokenType.GREATER: (None, Parser.binary, COMPARISON),
+    TokenType.GREATER_EQUAL: (None, Parser.binary, COMPARISON),
+    TokenType.LESS: (None, Parser.binary, COMPARISON),
+    TokenType.LESS_EQUAL: (None, Parser.binary, COMPARISON),
+    TokenType.IDENTIFIER: (Parser.variable, None, 0),
+    TokenType.STRING: (Parser.literal, None, 0),
+    TokenType.NUMBER: (Parser.literal, None, 0),
+    TokenType.AND: (None, Parser.logical, AND),
+    TokenType.OR: (None, Parser.logical, OR),
+    TokenType.FALSE: (Parser.keyword_literal, None, 0),
+    TokenType.TRUE: (Parser.keyword_literal, None, 0),
+    TokenType.NIL: (Parser.keyword_literal, None, 0),
+    TokenType.SUPER: (Parser.super_, None, 0),
+    TokenType.THIS: (Parser.this, None, 0),
+}
@@ -0,0 +1,98 @@
+import time
+from .objects import LoxClass, LoxFunction
+
+# Function-level profiler for the tree and closure engines. install() swaps
+# profiling wrappers in for LoxFunction.enter_tail, which every function and
+# method activation goes through (tail calls completed by the trampoline
+# included), and LoxClass.call; nothing is patched unless a profiler is
+# installed.
+class Profiler:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.stats = {}
+        self.collapsed = {}
+        self.stack = []
+        self.active = {}
+        self.names = {}
+        self.originals = None
+
+    def install(self):
+        self.originals = (LoxFunction.enter_tail, LoxClass.call)
+        enter_tail, class_call = self.originals
+        profiler = self
+
+        def profiled_enter_tail(function, interpreter, receiver, arguments):
+            if receiver is None:
+                profiler.enter(profiler.function_name(function))
+            else:
+                profiler.enter(profiler.method_name(function, receiver.klass))
+            try:
+                return enter_tail(function, interpreter, receiver, arguments)
+            finally:
+                profiler.leave()
+
+        def profiled_class_call(klass, interpreter, arguments):
+            profiler.enter(f"{klass.name}()")
+            try:
+                return class_call(klass, interpreter, arguments)
+            finally:
+                profiler.leave()
+
+        LoxFunction.enter_tail = profiled_enter_tail
+        LoxClass.call = profiled_class_call
+
+    def uninstall(self):
+        LoxFunction.enter_tail, LoxClass.call = self.originals
+        self.originals = None
+
+    def function_name(self, function):
+        declaration = function.declaration
+        name = self.names.get(declaration)
+        if name is None:
+            name = self.names[declaration] = f"{declaration.name.lexeme} (line {declaration.name.line})"
+        return name
+
+    def method_name(self, function, klass):
+        declaration = function.declaration
+        name = self.names.get(declaration)
+        if name is None:
+            method = declaration.name.lexeme
+            while klass.superclass is not None and klass.superclass.methods.get(method) is function:
+                klass = klass.superclass
+            name = self.names[declaration] = f"{klass.name}.{method} (line {declaration.name.line})"
+        return name
+
+    def enter(self, name):
+        self.active[name] = self.active.get(name, 0) + 1
+        self.stack.append([name, self.clock(), 0.0])
+
+    def leave(self):
+        name, start, children = self.stack.pop()
+        elapsed = self.clock() - start
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += elapsed - children
+        self.active[name] -= 1
+        if not self.active[name]:
+            # Only the outermost activation of a recursive function counts
+            # towards its cumulative time.
+            stats[2] += elapsed
+        if self.stack:
+            self.stack[-1][2] += elapsed
+        path = ("<script>",) + tuple(frame[0] for frame in self.stack) + (name,)
+        self.collapsed[path] = self.collapsed.get(path, 0.0) + elapsed - children
+
+    def report(self, limit=None):
+        rows = sorted(self.stats.items(), key=lambda item: item[1][1], reverse=True)
+        lines = [f"{'calls':>10}{'self ms':>12}{'cumul ms':>12}  function"]
+        for name, (calls, self_time, cumulative) in rows[:limit]:
+            lines.append(f"{calls:>10}{self_time * 1000:>12.3f}{cumulative * 1000:>12.3f}  {name}")
+        return "\n".join(lines)
+
+    def collapsed_stacks(self):
+        return "".join(
+            f"{';'.join(path)} {round(self_time * 1_000_000)}\n"
+            for path, self_time in sorted(self.collapsed.items())
+        )
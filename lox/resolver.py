@@ -1,6 +1,6 @@
 import enum
-from expr import *
-from stmt import *
+from .expr import *
+from .stmt import *
 
 class FunctionType(enum.Enum):
     NONE = enum.auto()
@@ -14,22 +14,23 @@ class ClassType(enum.Enum):
     SUBCLASS = enum.auto()
 
 class Resolver(Expr.Visitor, Stmt.Visitor):
-    def __init__(self, interpreter):
-        self.interpreter = interpreter
+    def __init__(self):
         self.scopes = []
+        self.slots = []
         self.current_function = FunctionType.NONE
         self.current_class = ClassType.NONE
 
     def visit_block_stmt(self, stmt):
         self.begin_scope()
         self.resolve_stmts(stmt.statements)
+        stmt.slot_count = len(self.slots[-1])
         self.end_scope()
         return None
     
     def visit_class_stmt(self, stmt):
         enclosing_class = self.current_class
         self.current_class = ClassType.CLASS
-        self.declare(stmt.name)
+        stmt.slot = self.declare(stmt.name)
         self.define(stmt.name)
         if stmt.superclass and stmt.name.lexeme == stmt.superclass.name.lexeme:
             raise ValueError("A class can't inherit from itself.")
@@ -38,15 +39,12 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
             self.resolve(stmt.superclass)
         if stmt.superclass:
             self.begin_scope()
-            self.scopes[-1]["super"] = True
-        self.begin_scope()
-        self.scopes[-1]["this"] = True
+            self.declare_implicit("super")
         for method in stmt.methods:
             declaration = FunctionType.METHOD
             if method.name.lexeme == "init":
                 declaration = FunctionType.INITIALIZER
             self.resolve_function(method, declaration)
-        self.end_scope()
         if stmt.superclass:
             self.end_scope()
 
@@ -58,7 +56,7 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         return None
     
     def visit_function_stmt(self, stmt):
-        self.declare(stmt.name)
+        stmt.slot = self.declare(stmt.name)
         self.define(stmt.name)
         self.resolve_function(stmt, FunctionType.FUNCTION)
         return None
@@ -81,10 +79,11 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
             if self.current_function == FunctionType.INITIALIZER:
                 raise ValueError("Can't return a value from an initializer.")
             self.resolve(stmt.value)
+            stmt.tail_call = isinstance(stmt.value, Call)
         return None
 
     def visit_var_stmt(self, stmt):
-        self.declare(stmt.name)
+        stmt.slot = self.declare(stmt.name)
         if stmt.initializer:
             self.resolve(stmt.initializer)
         self.define(stmt.name)
@@ -164,29 +163,49 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         obj.accept(self)
 
     def resolve_function(self, function, type):
+        if function.body is None:
+            function.lazy_body.context = (type, self.current_class, [dict(scope) for scope in self.scopes], [dict(slots) for slots in self.slots])
+            return
         enclosing_function = self.current_function
         self.current_function = type
         self.begin_scope()
+        if type in (FunctionType.METHOD, FunctionType.INITIALIZER):
+            self.declare_implicit("this")
         for param in function.params:
             self.declare(param)
             self.define(param)
         self.resolve_stmts(function.body)
+        function.slot_count = len(self.slots[-1])
         self.end_scope()
         self.current_function = enclosing_function
     
+    # Resolves a lazily parsed function body in the scopes it was declared in.
+    def resume(self, function):
+        type, self.current_class, self.scopes, self.slots = function.lazy_body.context
+        self.resolve_function(function, type)
+
     def begin_scope(self):
         self.scopes.append({})
+        self.slots.append({})
 
     def end_scope(self):
         self.scopes.pop()
+        self.slots.pop()
 
     def declare(self, name):
         if not self.scopes:
-            return
+            return None
         scope = self.scopes[-1]
         if name.lexeme in scope:
             raise ValueError(f"Variable '{name.lexeme}' already declared in this scope.")
         scope[name.lexeme] = False
+        slots = self.slots[-1]
+        slots[name.lexeme] = len(slots)
+        return slots[name.lexeme]
+
+    def declare_implicit(self, name):
+        self.scopes[-1][name] = True
+        self.slots[-1][name] = len(self.slots[-1])
 
     def define(self, name):
         if not self.scopes:
@@ -194,7 +213,8 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         self.scopes[-1][name.lexeme] = True
 
     def resolve_local(self, expr, name):
-        for index, scope in enumerate(reversed(self.scopes)):
-            if name.lexeme in scope:
-                self.interpreter.resolve(expr, index)
+        for index, slots in enumerate(reversed(self.slots)):
+            if name.lexeme in slots:
+                expr.depth = index
+                expr.slot = slots[name.lexeme]
                 return
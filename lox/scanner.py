@@ -1,164 +1,126 @@
+import re
+import sys
 from .token_file import Token
 from .token_type import TokenType
+from .token_buffer import TokenBuffer
+
+KEYWORDS = {
+    "and": TokenType.AND,
+    "class": TokenType.CLASS,
+    "else": TokenType.ELSE,
+    "false": TokenType.FALSE,
+    "for": TokenType.FOR,
+    "fun": TokenType.FUN,
+    "if": TokenType.IF,
+    "nil": TokenType.NIL,
+    "or": TokenType.OR,
+    "print": TokenType.PRINT,
+    "return": TokenType.RETURN,
+    "super": TokenType.SUPER,
+    "this": TokenType.THIS,
+    "true": TokenType.TRUE,
+    "var": TokenType.VAR,
+    "while": TokenType.WHILE
+}
+
+SYMBOLS = {
+    token_type.value: token_type
+    for token_type in TokenType
+    if token_type.value and not token_type.value.isalpha()
+}
+
+# Each match is the whitespace and comments before a token, then the token
+# itself in at most one of the remaining groups (none only for trailing
+# whitespace), so one regex match yields one token.
+TOKEN_PATTERN = re.compile(r"""
+    ((?:\s|//[^\n]*)*)
+    (?:
+        ([^\W\d]\w*)
+      | ([!=<>]=?|[(){};,.+\-*/])
+      | (\d+(?:\.\d+)?)
+      | ("[^"]*"?)
+      | (.)
+    )?
+""", re.VERBOSE | re.DOTALL)
+GROUPS = re.Match.groups
+SKIPPED, NAME, SYMBOL, NUMBER, STRING, ERROR = range(1, 7)
 
 class Scanner:
     def __init__(self, source):
         self.source = source
         self.tokens = []
-        self.start = 0
-        self.current = 0
         self.line = 1
 
     def scan_tokens(self):
-        while not self.is_at_end():
-            self.start = self.current
-            self.scan_token()
-
-        self.tokens.append(Token(TokenType.EOF, "", None, self.line))
+        self.tokens.extend(self.scan())
         return self.tokens
 
-    def scan_token(self):
-        self.skip_whitespace()
-        self.start = self.current
-    
-        if self.is_at_end():
-            return
-
-        char = self.advance()
-
-        if char == '(':
-            self.add_token(TokenType.LEFT_PAREN)
-        elif char == ')':
-            self.add_token(TokenType.RIGHT_PAREN)
-        elif char == '{':
-            self.add_token(TokenType.LEFT_BRACE)
-        elif char == '}':
-            self.add_token(TokenType.RIGHT_BRACE)
-        elif char == ';':
-            self.add_token(TokenType.SEMICOLON)
-        elif char == '=':
-            self.add_token(TokenType.EQUAL_EQUAL if self.match('=') else TokenType.EQUAL)
-        elif char == '+':
-            self.add_token(TokenType.PLUS)
-        elif char == '*':
-            self.add_token(TokenType.STAR)
-        elif char == '/':
-            self.add_token(TokenType.SLASH)
-        elif char == '-':
-            self.add_token(TokenType.MINUS)
-        elif char == '!':
-            self.add_token(TokenType.BANG_EQUAL if self.match('=') else TokenType.BANG)
-        elif char == '>':
-            self.add_token(TokenType.GREATER_EQUAL if self.match('=') else TokenType.GREATER)
-        elif char == '<':
-            self.add_token(TokenType.LESS_EQUAL if self.match('=') else TokenType.LESS)
-        elif char == '.':
-            self.add_token(TokenType.DOT)
-        elif char == ',':
-            self.add_token(TokenType.COMMA)
-        elif char == '"':
-            self.string()
-        elif char.isdigit():
-            self.number()
-        elif char.isalpha() or char == '_':
-            self.identifier()
-        else:
-            print(f"Unexpected character {char} at line {self.line}")
-
-    def skip_whitespace(self):
-        while True:
-            c = self.peek()
-            if c.isspace():
-                if c == '\n':
-                    self.line += 1
-                self.advance()
-            elif c == '/' and self.peek_next() == '/':
-                while self.peek() != '\n' and not self.is_at_end():
-                    self.advance()
+    # Identifier and symbol lexemes are interned so that environment and field
+    # lookups keyed by them hit the identity fast path; repeated numbers share
+    # their lexeme and value. A large source then holds one string per
+    # distinct name instead of one per occurrence.
+    def scan(self):
+        line = 1
+        keywords = KEYWORDS
+        symbols = SYMBOLS
+        identifier = TokenType.IDENTIFIER
+        intern = sys.intern
+        numbers = {}
+        for skipped, name, symbol, number, string, error in map(GROUPS, TOKEN_PATTERN.finditer(self.source)):
+            if skipped:
+                line += skipped.count('\n')
+            if name:
+                yield Token(keywords.get(name, identifier), intern(name), None, line)
+            elif symbol:
+                yield Token(symbols[symbol], intern(symbol), None, line)
+            elif number:
+                cached = numbers.get(number)
+                if cached is None:
+                    cached = numbers[number] = (number, float(number))
+                yield Token(TokenType.NUMBER, cached[0], cached[1], line)
+            elif string:
+                line += string.count('\n')
+                if len(string) < 2 or string[-1] != '"':
+                    print(f"Unterminated string at line {line}")
+                else:
+                    yield Token(TokenType.STRING, string, string[1:-1], line)
+            elif error:
+                print(f"Unexpected character {error} at line {line}")
+        self.line = self.source.count('\n') + 1
+        yield Token(TokenType.EOF, "", None, self.line)
+
+    # Same tokens as scan(), stored as columns in a TokenBuffer instead of as
+    # Token objects.
+    def scan_buffer(self):
+        source = self.source
+        buffer = TokenBuffer(source)
+        append = buffer.append
+        count = source.count
+        keywords = KEYWORDS
+        symbols = SYMBOLS
+        identifier = TokenType.IDENTIFIER
+        line = 1
+        for match in TOKEN_PATTERN.finditer(source):
+            kind = match.lastindex
+            if kind == SKIPPED:
+                continue
+            start = match.start(kind)
+            end = match.end()
+            line += count('\n', match.start(), start)
+            if kind == NAME:
+                append(keywords.get(source[start:end], identifier), start, end - start, line)
+            elif kind == SYMBOL:
+                append(symbols[source[start:end]], start, end - start, line)
+            elif kind == NUMBER:
+                append(TokenType.NUMBER, start, end - start, line)
+            elif kind == STRING:
+                line += count('\n', start, end)
+                if end - start < 2 or source[end - 1] != '"':
+                    print(f"Unterminated string at line {line}")
+                else:
+                    append(TokenType.STRING, start, end - start, line)
             else:
-                return
-
-    def identifier(self):
-        while self.peek().isalnum() or self.peek() == '_':
-            self.advance()
-
-        text = self.source[self.start:self.current]
-
-        keywords = {
-            "and": TokenType.AND,
-            "class": TokenType.CLASS,
-            "else": TokenType.ELSE,
-            "false": TokenType.FALSE,
-            "for": TokenType.FOR,
-            "fun": TokenType.FUN,
-            "if": TokenType.IF,
-            "nil": TokenType.NIL,
-            "or": TokenType.OR,
-            "print": TokenType.PRINT,
-            "return": TokenType.RETURN,
-            "super": TokenType.SUPER,
-            "this": TokenType.THIS,
-            "true": TokenType.TRUE,
-            "var": TokenType.VAR,
-            "while": TokenType.WHILE
-        }
-
-
-        token_type = keywords.get(text, TokenType.IDENTIFIER)
-
-        self.add_token(token_type)
-
-    def string(self):
-        while self.peek() != '"' and not self.is_at_end():
-            if self.peek() == '\n':
-                self.line += 1
-            self.advance()
-
-        if self.is_at_end():
-            print(f"Unterminated string at line {self.line}")
-            return
-
-        self.advance() 
-        value = self.source[self.start + 1:self.current - 1]
-        self.add_token(TokenType.STRING, value)
-
-    def number(self):
-        while self.peek().isdigit():
-            self.advance()
-
-        if self.peek() == '.' and self.peek_next().isdigit():
-            self.advance()
-            while self.peek().isdigit():
-                self.advance()
-
-        value = float(self.source[self.start:self.current])
-        self.add_token(TokenType.NUMBER, value)
-
-    def add_token(self, token_type, literal=None):
-        text = self.source[self.start:self.current]
-        self.tokens.append(Token(token_type, text, literal, self.line))
-
-    def advance(self):
-        self.current += 1
-        return self.source[self.current - 1]
-
-    def peek(self):
-        if self.is_at_end():
-            return '\0'
-        return self.source[self.current]
-
-    def peek_next(self):
-        if self.current + 1 >= len(self.source):
-            return '\0'
-        return self.source[self.current + 1]
-
-    def is_at_end(self):
-        return self.current >= len(self.source)
-    
-    def match(self, expected):
-        if self.is_at_end():
-            return False
-        if self.source[self.current] != expected:
-            return False
-        self.current += 1
-        return True
\ No newline at end of file
+                print(f"Unexpected character {source[start]} at line {line}")
+        self.line = count('\n') + 1
+        append(TokenType.EOF, len(source), 0, self.line)
+        return buffer
@@ -1,6 +1,9 @@
+# Generated by tools/generate_ast.py from its node definitions; edit those
+# and regenerate instead of changing this file.
 from abc import ABC, abstractmethod
 
 class Stmt(ABC):
+	__slots__ = ()
 
 	@abstractmethod
 	def accept(self, visitor):
@@ -45,24 +48,40 @@ class Stmt(ABC):
 			pass
 
 class Block(Stmt):
+	__slots__ = ("statements", "slot_count",)
+	kind = 12
 
 	def __init__(self, statements):
 		self.statements = statements
+		self.slot_count = 0
 
 	def accept(self, visitor):
 		return visitor.visit_block_stmt(self)
 
+	@property
+	def line(self):
+		return None
+
 class Class(Stmt):
+	__slots__ = ("name", "superclass", "methods", "slot",)
+	kind = 13
 
 	def __init__(self, name, superclass, methods):
 		self.name = name
 		self.superclass = superclass
 		self.methods = methods
+		self.slot = None
 
 	def accept(self, visitor):
 		return visitor.visit_class_stmt(self)
 
+	@property
+	def line(self):
+		return self.name.line
+
 class Expression(Stmt):
+	__slots__ = ("expression",)
+	kind = 14
 
 	def __init__(self, expression):
 		self.expression = expression
@@ -70,17 +89,32 @@ class Expression(Stmt):
 	def accept(self, visitor):
 		return visitor.visit_expression_stmt(self)
 
+	@property
+	def line(self):
+		return self.expression.line
+
 class Function(Stmt):
+	__slots__ = ("name", "params", "body", "slot", "slot_count", "lazy_body",)
+	kind = 15
 
 	def __init__(self, name, params, body):
 		self.name = name
 		self.params = params
 		self.body = body
+		self.slot = None
+		self.slot_count = len(params)
+		self.lazy_body = None
 
 	def accept(self, visitor):
 		return visitor.visit_function_stmt(self)
 
+	@property
+	def line(self):
+		return self.name.line
+
 class If(Stmt):
+	__slots__ = ("condition", "then_branch", "else_branch",)
+	kind = 16
 
 	def __init__(self, condition, then_branch, else_branch):
 		self.condition = condition
@@ -90,7 +124,13 @@ class If(Stmt):
 	def accept(self, visitor):
 		return visitor.visit_if_stmt(self)
 
+	@property
+	def line(self):
+		return self.condition.line
+
 class Print(Stmt):
+	__slots__ = ("expression",)
+	kind = 17
 
 	def __init__(self, expression):
 		self.expression = expression
@@ -98,29 +138,55 @@ class Print(Stmt):
 	def accept(self, visitor):
 		return visitor.visit_print_stmt(self)
 
+	@property
+	def line(self):
+		return self.expression.line
+
 class Return(Stmt):
+	__slots__ = ("keyword", "value", "tail_call",)
+	kind = 18
 
 	def __init__(self, keyword, value):
 		self.keyword = keyword
 		self.value = value
+		self.tail_call = False
 
 	def accept(self, visitor):
 		return visitor.visit_return_stmt(self)
 
+	@property
+	def line(self):
+		return self.keyword.line
+
 class Var(Stmt):
+	__slots__ = ("name", "initializer", "slot",)
+	kind = 19
 
 	def __init__(self, name, initializer):
 		self.name = name
 		self.initializer = initializer
+		self.slot = None
 
 	def accept(self, visitor):
 		return visitor.visit_var_stmt(self)
 
+	@property
+	def line(self):
+		return self.name.line
+
 class While(Stmt):
+	__slots__ = ("condition", "body",)
+	kind = 20
 
 	def __init__(self, condition, body):
 		self.condition = condition
 		self.body = body
 
 	def accept(self, visitor):
-		return visitor.visit_while_stmt(self)
\ No newline at end of file
+		return visitor.visit_while_stmt(self)
+
+	@property
+	def line(self):
+		return self.condition.line
+
+STMT_NODES = (Block, Class, Expression, Function, If, Print, Return, Var, While,)
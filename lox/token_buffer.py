@@ -0,0 +1,85 @@
+import array
+import sys
+from .token_file import Token
+from .token_type import TokenType
+
+TOKEN_TYPES = list(TokenType)
+TOKEN_TYPE_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+# Column-oriented token storage: one small integer per token in each of four
+# parallel arrays, over the original source string. A Token is only built
+# when a token is read, so a parser iterating the buffer keeps just the
+# tokens its AST holds on to.
+class TokenBuffer:
+    def __init__(self, source):
+        self.source = source
+        self.types = array.array("B")
+        self.starts = array.array("I")
+        self.lengths = array.array("I")
+        self.lines = array.array("I")
+
+    def append(self, token_type, start, length, line):
+        self.types.append(TOKEN_TYPE_CODES[token_type])
+        self.starts.append(start)
+        self.lengths.append(length)
+        self.lines.append(line)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        token_type = TOKEN_TYPES[self.types[index]]
+        start = self.starts[index]
+        lexeme = self.source[start:start + self.lengths[index]]
+        literal = None
+        if token_type == TokenType.NUMBER:
+            literal = float(lexeme)
+        elif token_type == TokenType.STRING:
+            literal = lexeme[1:-1]
+        else:
+            lexeme = sys.intern(lexeme)
+        return Token(token_type, lexeme, literal, self.lines[index])
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def iter_from(self, index):
+        source = self.source
+        token_types = TOKEN_TYPES
+        number = TokenType.NUMBER
+        string = TokenType.STRING
+        intern = sys.intern
+        columns = (self.types, self.starts, self.lengths, self.lines)
+        if index:
+            columns = [memoryview(column)[index:] for column in columns]
+        for code, start, length, line in zip(*columns):
+            token_type = token_types[code]
+            lexeme = source[start:start + length]
+            if token_type is number:
+                yield Token(token_type, lexeme, float(lexeme), line)
+            elif token_type is string:
+                yield Token(token_type, lexeme, lexeme[1:-1], line)
+            else:
+                yield Token(token_type, intern(lexeme), None, line)
+
+    # Index of the '}' closing the '{' at `index`, found from the type column
+    # alone, or None if the braces don't balance.
+    def match_brace(self, index):
+        types = self.types
+        left = TOKEN_TYPE_CODES[TokenType.LEFT_BRACE]
+        right = TOKEN_TYPE_CODES[TokenType.RIGHT_BRACE]
+        if types[index] != left:
+            return None
+        depth = 0
+        for end in range(index, len(types)):
+            code = types[end]
+            if code == left:
+                depth += 1
+            elif code == right:
+                depth -= 1
+                if not depth:
+                    return end
+        return None
+
+    def nbytes(self):
+        return sum(column.itemsize * len(column) for column in (self.types, self.starts, self.lengths, self.lines))
@@ -1,4 +1,6 @@
 class Token:
+    __slots__ = ("token_type", "lexeme", "literal", "line")
+
     def __init__(self, token_type, lexeme, literal, line):
         self.token_type = token_type
         self.lexeme = lexeme
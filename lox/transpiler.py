@@ -0,0 +1,583 @@
+import math
+import types
+from .token_type import TokenType
+from .expr import *
+from .stmt import *
+from .objects import *
+from .interpreter import Interpreter
+from .operators import add
+
+SCRIPT_NAME = "__lox_script__"
+
+OPERATORS = {
+    TokenType.MINUS: "-",
+    TokenType.STAR: "*",
+    TokenType.SLASH: "/",
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+    TokenType.EQUAL_EQUAL: "==",
+    TokenType.BANG_EQUAL: "!=",
+}
+
+BOOLEAN_OPERATORS = (
+    TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS,
+    TokenType.LESS_EQUAL, TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL,
+)
+
+class Binding:
+    def __init__(self, name, function, in_loop):
+        self.name = name
+        self.function = function
+        self.in_loop = in_loop
+        self.captured = False
+        self.defined = False
+
+    @property
+    def boxed(self):
+        return self.captured and self.in_loop
+
+class FunctionInfo:
+    def __init__(self, parent, kind):
+        self.parent = parent
+        self.kind = kind
+        self.loop_depth = 0
+        self.params = []
+        self.globals = set()
+        self.nonlocals = set()
+        self.free = set()
+
+class ScopeAnalyzer(Expr.Visitor, Stmt.Visitor):
+    def __init__(self):
+        self.scopes = []
+        self.function = None
+        self.class_stack = []
+        self.bindings = {}
+        self.functions = {}
+        self.super_names = {}
+        self.counter = 0
+
+    def analyze(self, statements):
+        self.function = FunctionInfo(None, "script")
+        for stmt in statements:
+            stmt.accept(self)
+        return self.function
+
+    def unique(self, prefix, name):
+        self.counter += 1
+        return f"{prefix}{self.counter}_{name}"
+
+    def declare(self, node, name):
+        if not self.scopes:
+            self.function.globals.add(name)
+            self.bindings[node] = None
+            return None
+        scope = self.scopes[-1]
+        if name in scope:
+            raise ValueError(f"Variable '{name}' already declared in this scope.")
+        binding = Binding(self.unique("l", name), self.function, self.function.loop_depth > 0)
+        scope[name] = binding
+        self.bindings[node] = binding
+        return binding
+
+    def define(self, binding):
+        if binding is not None:
+            binding.defined = True
+
+    def resolve(self, node, name, assign=False):
+        for scope in reversed(self.scopes):
+            binding = scope.get(name)
+            if binding is None:
+                continue
+            if not binding.defined and not assign:
+                raise ValueError("Can't read local variable in its own initializer.")
+            if binding.function is not self.function:
+                binding.captured = True
+                function = self.function
+                while function.parent is not binding.function:
+                    function = function.parent
+                function.free.add(binding)
+                if assign:
+                    self.function.nonlocals.add(binding)
+            self.bindings[node] = binding
+            return
+        self.bindings[node] = None
+
+    def function_scope(self, declaration, kind):
+        info = FunctionInfo(self.function, kind)
+        self.functions[declaration] = info
+        enclosing = self.function
+        self.function = info
+        self.scopes.append({})
+        for param in declaration.params:
+            binding = self.declare(param, param.lexeme)
+            self.define(binding)
+            info.params.append(binding)
+        for stmt in declaration.body:
+            stmt.accept(self)
+        self.scopes.pop()
+        self.function = enclosing
+
+    def visit_block_stmt(self, stmt):
+        self.scopes.append({})
+        for statement in stmt.statements:
+            statement.accept(self)
+        self.scopes.pop()
+
+    def visit_class_stmt(self, stmt):
+        binding = self.declare(stmt, stmt.name.lexeme)
+        self.define(binding)
+        if stmt.superclass is not None:
+            if stmt.superclass.name.lexeme == stmt.name.lexeme:
+                raise ValueError("A class can't inherit from itself.")
+            stmt.superclass.accept(self)
+            self.counter += 1
+            self.super_names[stmt] = f"s{self.counter}"
+        self.class_stack.append(stmt)
+        for method in stmt.methods:
+            kind = "initializer" if method.name.lexeme == "init" else "method"
+            self.function_scope(method, kind)
+        self.class_stack.pop()
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression.accept(self)
+
+    def visit_function_stmt(self, stmt):
+        binding = self.declare(stmt, stmt.name.lexeme)
+        self.define(binding)
+        self.function_scope(stmt, "function")
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition.accept(self)
+        stmt.then_branch.accept(self)
+        if stmt.else_branch is not None:
+            stmt.else_branch.accept(self)
+
+    def visit_print_stmt(self, stmt):
+        stmt.expression.accept(self)
+
+    def visit_return_stmt(self, stmt):
+        if self.function.kind == "script":
+            raise ValueError("Can't return from top-level code.")
+        if stmt.value is not None:
+            if self.function.kind == "initializer":
+                raise ValueError("Can't return a value from an initializer.")
+            stmt.value.accept(self)
+
+    def visit_var_stmt(self, stmt):
+        binding = self.declare(stmt, stmt.name.lexeme)
+        if stmt.initializer is not None:
+            stmt.initializer.accept(self)
+        self.define(binding)
+
+    def visit_while_stmt(self, stmt):
+        stmt.condition.accept(self)
+        self.function.loop_depth += 1
+        stmt.body.accept(self)
+        self.function.loop_depth -= 1
+
+    def visit_assign_expr(self, expr):
+        expr.value.accept(self)
+        self.resolve(expr, expr.name.lexeme, assign=True)
+
+    def visit_binary_expr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_call_expr(self, expr):
+        expr.callee.accept(self)
+        for arg in expr.arguments:
+            arg.accept(self)
+
+    def visit_get_expr(self, expr):
+        expr.object.accept(self)
+
+    def visit_grouping_expr(self, expr):
+        expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        pass
+
+    def visit_logical_expr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_set_expr(self, expr):
+        expr.object.accept(self)
+        expr.value.accept(self)
+
+    def visit_super_expr(self, expr):
+        if not self.class_stack:
+            raise ValueError("Can't use 'super' outside of a class.")
+        if self.class_stack[-1].superclass is None:
+            raise ValueError("Can't use 'super' in a class with no superclass.")
+
+    def visit_this_expr(self, expr):
+        if not self.class_stack:
+            raise ValueError("Can't use 'this' outside of a class.")
+
+    def visit_unary_expr(self, expr):
+        expr.right.accept(self)
+
+    def visit_variable_expr(self, expr):
+        self.resolve(expr, expr.name.lexeme)
+
+class Transpiler(Expr.Visitor, Stmt.Visitor):
+    def __init__(self):
+        self.lines = []
+        self.indent = 0
+        self.temps = 0
+
+    def transpile(self, statements):
+        analyzer = ScopeAnalyzer()
+        script = analyzer.analyze(statements)
+        self.bindings = analyzer.bindings
+        self.functions = analyzer.functions
+        self.super_names = analyzer.super_names
+        self.class_stack = []
+        self.function = script
+        self.emit(f"def {SCRIPT_NAME}():")
+        self.emit_body(script, statements)
+        return "\n".join(self.lines) + "\n"
+
+    def emit(self, line):
+        self.lines.append("    " * self.indent + line)
+
+    def temp(self):
+        self.temps += 1
+        return f"_t{self.temps}"
+
+    def emit_body(self, info, statements, initializer=False):
+        self.indent += 1
+        start = len(self.lines)
+        if info.globals:
+            self.emit("global " + ", ".join(sorted("g_" + name for name in info.globals)))
+        nonlocals = sorted(b.name for b in info.nonlocals if not b.boxed)
+        if nonlocals:
+            self.emit("nonlocal " + ", ".join(nonlocals))
+        for stmt in statements:
+            stmt.accept(self)
+        if initializer:
+            self.emit("return this_")
+        if len(self.lines) == start:
+            self.emit("pass")
+        self.indent -= 1
+
+    def emit_block(self, stmt):
+        start = len(self.lines)
+        self.indent += 1
+        stmt.accept(self)
+        if len(self.lines) == start:
+            self.emit("pass")
+        self.indent -= 1
+
+    # Names
+
+    def read(self, binding, name):
+        if binding is None:
+            return "g_" + name
+        if binding.boxed:
+            return binding.name + "[0]"
+        return binding.name
+
+    def declare(self, node, name, value):
+        binding = self.bindings[node]
+        if binding is not None and binding.boxed:
+            self.emit(f"{binding.name} = [{value}]")
+        else:
+            self.emit(f"{self.read(binding, name)} = {value}")
+
+    def truthy(self, expr):
+        if isinstance(expr, Literal):
+            return "True" if expr.value is not None and expr.value is not False else "False"
+        if isinstance(expr, Binary) and expr.operator.token_type in BOOLEAN_OPERATORS:
+            return self.evaluate(expr)
+        if isinstance(expr, Unary) and expr.operator.token_type == TokenType.BANG:
+            return self.evaluate(expr)
+        t = self.temp()
+        return f"(({t} := {self.evaluate(expr)}) is not None and {t} is not False)"
+
+    def evaluate(self, expr):
+        return expr.accept(self)
+
+    def emit_function(self, declaration, python_name, receiver=False, super_name=None):
+        info = self.functions[declaration]
+        params = [binding.name for binding in info.params]
+        if receiver:
+            params.insert(0, "this_")
+        keywords = [f"{b.name}={b.name}" for b in sorted(info.free, key=lambda b: b.name) if b.boxed]
+        if super_name is not None:
+            keywords.append(f"{super_name}={super_name}")
+        if keywords:
+            params += ["*"] + keywords
+        self.emit(f"def {python_name}({', '.join(params)}):")
+        enclosing = self.function
+        self.function = info
+        self.emit_body(info, declaration.body, info.kind == "initializer")
+        self.function = enclosing
+        self.emit(f"{python_name}.lox_arity = {len(declaration.params)}")
+
+    # Statements
+
+    def visit_block_stmt(self, stmt):
+        for statement in stmt.statements:
+            statement.accept(self)
+
+    def visit_class_stmt(self, stmt):
+        binding = self.bindings[stmt]
+        name = stmt.name.lexeme
+        if binding is not None and binding.boxed:
+            self.emit(f"{binding.name} = [None]")
+        super_name = self.super_names.get(stmt)
+        if super_name is not None:
+            self.emit(f"{super_name} = check_superclass({self.evaluate(stmt.superclass)})")
+        self.class_stack.append(stmt)
+        methods = []
+        for method in stmt.methods:
+            self.temps += 1
+            python_name = f"m{self.temps}_{method.name.lexeme}"
+            self.emit_function(method, python_name, receiver=True, super_name=super_name)
+            methods.append(f"{method.name.lexeme!r}: {python_name}")
+        self.class_stack.pop()
+        value = f"TranspiledClass({name!r}, {super_name}, {{{', '.join(methods)}}})"
+        if binding is not None and binding.boxed:
+            self.emit(f"{binding.name}[0] = {value}")
+        else:
+            self.emit(f"{self.read(binding, name)} = {value}")
+
+    def visit_expression_stmt(self, stmt):
+        expr = stmt.expression
+        if isinstance(expr, Assign) and self.bindings[expr] is not None:
+            target = self.read(self.bindings[expr], expr.name.lexeme)
+            self.emit(f"{target} = {self.evaluate(expr.value)}")
+        else:
+            self.emit(self.evaluate(expr))
+
+    def visit_function_stmt(self, stmt):
+        binding = self.bindings[stmt]
+        name = stmt.name.lexeme
+        if binding is not None and binding.boxed:
+            self.emit(f"{binding.name} = [None]")
+            self.emit_function(stmt, binding.name + "_fn")
+            self.emit(f"{binding.name}[0] = {binding.name}_fn")
+        else:
+            self.emit_function(stmt, self.read(binding, name))
+
+    def visit_if_stmt(self, stmt):
+        self.emit(f"if {self.truthy(stmt.condition)}:")
+        self.emit_block(stmt.then_branch)
+        if stmt.else_branch is not None:
+            self.emit("else:")
+            self.emit_block(stmt.else_branch)
+
+    def visit_print_stmt(self, stmt):
+        self.emit(f"print(stringify({self.evaluate(stmt.expression)}))")
+
+    def visit_return_stmt(self, stmt):
+        if self.function.kind == "initializer":
+            self.emit("return this_")
+        elif stmt.value is None:
+            self.emit("return None")
+        else:
+            self.emit(f"return {self.evaluate(stmt.value)}")
+
+    def visit_var_stmt(self, stmt):
+        value = "None" if stmt.initializer is None else self.evaluate(stmt.initializer)
+        self.declare(stmt, stmt.name.lexeme, value)
+
+    def visit_while_stmt(self, stmt):
+        self.emit(f"while {self.truthy(stmt.condition)}:")
+        self.emit_block(stmt.body)
+
+    # Expressions
+
+    def visit_assign_expr(self, expr):
+        binding = self.bindings[expr]
+        value = self.evaluate(expr.value)
+        if binding is None:
+            return f"assign_global({'g_' + expr.name.lexeme!r}, {value})"
+        if binding.boxed:
+            return f"store({binding.name}, {value})"
+        return f"({self.read(binding, expr.name.lexeme)} := {value})"
+
+    def visit_binary_expr(self, expr):
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        t = expr.operator.token_type
+        if t == TokenType.PLUS:
+            a = self.temp()
+            b = self.temp()
+            return f"({a} + {b} if ({a} := {left}).__class__ is ({b} := {right}).__class__ is float else add({a}, {b}))"
+        op = OPERATORS.get(t)
+        if op is None:
+            raise ValueError(f"Unknown binary operator {t}")
+        return f"({left} {op} {right})"
+
+    # Every Lox callable carries its arity as `lox_arity`, so a call checks it
+    # inline and only takes the slower `call` route when it doesn't match.
+    # The callee and arguments are evaluated into temporaries first, as the
+    # other engines evaluate them before any check.
+    def visit_call_expr(self, expr):
+        f = self.temp()
+        values = [f"({f} := {self.evaluate(expr.callee)})"]
+        names = []
+        for arg in expr.arguments:
+            names.append(self.temp())
+            values.append(f"({names[-1]} := {self.evaluate(arg)})")
+        arguments = ", ".join(names)
+        test = f"({', '.join(values)})[0]" if names else values[0]
+        return f"({f}({arguments}) if {test}.lox_arity == {len(names)} else call({', '.join([f] + names)}))"
+
+    def visit_get_expr(self, expr):
+        return f"get_property({self.evaluate(expr.object)}, {expr.name.lexeme!r})"
+
+    def visit_grouping_expr(self, expr):
+        return self.evaluate(expr.expression)
+
+    def visit_literal_expr(self, expr):
+        value = expr.value
+        if isinstance(value, float) and not math.isfinite(value):
+            return f"float({str(value)!r})"
+        return repr(value)
+
+    def visit_logical_expr(self, expr):
+        t = self.temp()
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        test = f"(({t} := {left}) is not None and {t} is not False)"
+        if expr.operator.token_type == TokenType.OR:
+            return f"({t} if {test} else {right})"
+        return f"({right} if {test} else {t})"
+
+    def visit_set_expr(self, expr):
+        return f"set_property({self.evaluate(expr.object)}, {expr.name.lexeme!r}, {self.evaluate(expr.value)})"
+
+    def visit_super_expr(self, expr):
+        super_name = self.super_names[self.class_stack[-1]]
+        return f"get_super({super_name}, this_, {expr.method.lexeme!r})"
+
+    def visit_this_expr(self, expr):
+        return "this_"
+
+    def visit_unary_expr(self, expr):
+        right = self.evaluate(expr.right)
+        if expr.operator.token_type == TokenType.MINUS:
+            return f"(-{right})"
+        t = self.temp()
+        return f"(({t} := {right}) is None or {t} is False)"
+
+    def visit_variable_expr(self, expr):
+        return self.read(self.bindings[expr], expr.name.lexeme)
+
+class TranspiledClass(LoxClass):
+    @property
+    def lox_arity(self):
+        return self.arity()
+
+    def arity(self):
+        initializer = self.initializer
+        if initializer is not None:
+            return initializer.__code__.co_argcount - 1
+        return 0
+
+    def __call__(self, *arguments):
+        instance = LoxInstance(self)
+        initializer = self.initializer
+        if initializer is not None:
+            initializer(instance, *arguments)
+        elif arguments:
+            raise RuntimeError(f"Expected 0 arguments but got {len(arguments)}.")
+        return instance
+
+    def call(self, interpreter, arguments):
+        return self(*arguments)
+
+def call(callee, *arguments):
+    arity = getattr(callee, "lox_arity", None)
+    if arity is None:
+        raise RuntimeError("Can only call functions and classes.")
+    if len(arguments) != arity:
+        raise RuntimeError(f"Expected {arity} arguments but got {len(arguments)}.")
+    return callee(*arguments)
+
+def store(box, value):
+    box[0] = value
+    return value
+
+def check_superclass(superclass):
+    if not isinstance(superclass, LoxClass):
+        raise RuntimeError("Superclass must be a class.")
+    return superclass
+
+def get_property(obj, name):
+    if not isinstance(obj, LoxInstance):
+        raise RuntimeError("Only instances have properties.")
+    index = obj.shape.fields.get(name)
+    if index is not None:
+        return obj.values[index]
+    method = obj.klass.find_method(name)
+    if method is None:
+        raise RuntimeError(f"Undefined property '{name}'.")
+    return types.MethodType(method, obj)
+
+def set_property(obj, name, value):
+    if not isinstance(obj, LoxInstance):
+        raise RuntimeError("Only instances have fields.")
+    obj.set(name, value)
+    return value
+
+def get_super(superclass, instance, name):
+    method = superclass.find_method(name)
+    if method is None:
+        raise RuntimeError(f"Undefined property '{name}'.")
+    return types.MethodType(method, instance)
+
+class TranspiledInterpreter(Interpreter):
+    def __init__(self):
+        self.show_source = False
+        self.namespace = {
+            "stringify": self.stringify,
+            "add": add,
+            "call": call,
+            "store": store,
+            "assign_global": self.assign_global,
+            "check_superclass": check_superclass,
+            "get_property": get_property,
+            "set_property": set_property,
+            "get_super": get_super,
+            "TranspiledClass": TranspiledClass,
+        }
+        super().__init__()
+
+    def define_native(self, name, arity, function):
+        super().define_native(name, arity, function)
+        self.namespace["g_" + name] = self.globals.values[name]
+
+    # Lox assignment never creates a global, so the name must already be
+    # defined.
+    def assign_global(self, name, value):
+        if name not in self.namespace:
+            raise RuntimeError(f"Undefined variable '{name[2:]}'.")
+        self.namespace[name] = value
+        return value
+
+    def compile(self, statements):
+        source = Transpiler().transpile(statements)
+        if self.show_source:
+            print(source)
+        return compile(source, "<lox>", "exec")
+
+    def interpret(self, statements):
+        exec(self.compile(statements), self.namespace)
+        try:
+            self.namespace.pop(SCRIPT_NAME)()
+        except NameError as error:
+            name = error.name or ""
+            if not name.startswith("g_"):
+                raise
+            raise RuntimeError(f"Undefined variable '{name[2:]}'.") from None
+        except AttributeError as error:
+            if error.name != "lox_arity":
+                raise
+            raise RuntimeError("Can only call functions and classes.") from None
@@ -0,0 +1,97 @@
+from .objects import LoxList
+from .operators import stringify
+from .natives import number, lox_list, length
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Numeric vector backed by a NumPy array, available only when NumPy is
+# installed. Arithmetic and comparison operators work element-wise against
+# another vector of the same length or a number, so every engine gets them
+# through its ordinary binary operators. Equality stays identity, as for
+# lists and instances.
+class LoxVector:
+    __slots__ = ("array",)
+
+    def __init__(self, array):
+        self.array = array
+
+    def __str__(self):
+        return "vector[" + ", ".join(map(stringify, self.array.tolist())) + "]"
+
+    def __neg__(self):
+        return LoxVector(-self.array)
+
+def operand(value):
+    if value.__class__ is LoxVector:
+        return value.array
+    if value.__class__ is float:
+        return value
+    return None
+
+def elementwise(function, reflected=False):
+    def method(self, other):
+        other = operand(other)
+        if other is None:
+            return NotImplemented
+        left, right = (other, self.array) if reflected else (self.array, other)
+        try:
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                return LoxVector(function(left, right))
+        except ValueError:
+            raise RuntimeError("Vectors must have the same length.") from None
+    return method
+
+if numpy is not None:
+    for name, function in (("add", numpy.add), ("sub", numpy.subtract), ("mul", numpy.multiply), ("truediv", numpy.true_divide)):
+        setattr(LoxVector, f"__{name}__", elementwise(function))
+        setattr(LoxVector, f"__r{name}__", elementwise(function, reflected=True))
+    for name, function in (("lt", numpy.less), ("le", numpy.less_equal), ("gt", numpy.greater), ("ge", numpy.greater_equal)):
+        setattr(LoxVector, f"__{name}__", elementwise(function))
+
+def vector(value):
+    if value.__class__ is LoxVector:
+        return value
+    elements = lox_list(value)
+    if any(element.__class__ is not float for element in elements):
+        raise RuntimeError("Vectors can only hold numbers.")
+    return LoxVector(numpy.array(elements, dtype=float))
+
+def vector_range(start, stop, step):
+    if number(step) == 0:
+        raise RuntimeError("Range step can't be zero.")
+    return LoxVector(numpy.arange(number(start), number(stop), step))
+
+def array_of(value):
+    if value.__class__ is not LoxVector:
+        raise RuntimeError("Argument must be a vector.")
+    return value.array
+
+def reduction(function):
+    def native(value):
+        array = array_of(value)
+        if not len(array):
+            raise RuntimeError("Can't reduce an empty vector.")
+        return float(function(array))
+    return native
+
+def vector_length(value):
+    if value.__class__ is LoxVector:
+        return float(len(value.array))
+    return length(value)
+
+def to_list(value):
+    return LoxList(array_of(value).tolist())
+
+VECTOR_LIBRARY = [] if numpy is None else [
+    ("vector", 1, vector),
+    ("range", 3, vector_range),
+    ("toList", 1, to_list),
+    ("len", 1, vector_length),
+    ("sum", 1, reduction(numpy.sum)),
+    ("mean", 1, reduction(numpy.mean)),
+    ("minimum", 1, reduction(numpy.min)),
+    ("maximum", 1, reduction(numpy.max)),
+]
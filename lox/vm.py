@@ -0,0 +1,428 @@
+from .chunk import *
+from .compiler import Compiler
+from .disassembler import disassemble
+from .objects import *
+from .interpreter import Interpreter
+from .operators import add
+
+# Frames live in a list rather than on the Python stack, so this only guards
+# against runaway recursion; it can be raised as far as memory allows.
+FRAMES_MAX = 1000000
+
+class Upvalue:
+    __slots__ = ("location", "closed", "value")
+
+    def __init__(self, location):
+        self.location = location
+        self.closed = False
+        self.value = None
+
+class VMClosure(LoxCallable):
+    def __init__(self, function):
+        self.function = function
+        self.upvalues = [None] * function.upvalue_count
+
+    def bind(self, instance):
+        return BoundMethod(instance, self)
+
+    def arity(self):
+        return self.function.arity
+
+    def call(self, interpreter, arguments):
+        return interpreter.call_from_host(self, None, arguments)
+
+    def __str__(self):
+        return str(self.function)
+
+class BoundMethod(LoxCallable):
+    def __init__(self, receiver, method):
+        self.receiver = receiver
+        self.method = method
+
+    def arity(self):
+        return self.method.arity()
+
+    def call(self, interpreter, arguments):
+        return interpreter.call_from_host(self.method, self.receiver, arguments)
+
+    def __str__(self):
+        return str(self.method)
+
+class CallFrame:
+    __slots__ = ("closure", "ip", "base")
+
+    def __init__(self, closure, base):
+        self.closure = closure
+        self.ip = 0
+        self.base = base
+
+class VM(Interpreter):
+    def __init__(self):
+        super().__init__()
+        self.stack = []
+        self.frames = []
+        self.open_upvalues = []
+        self.disassemble = False
+        self.max_frames = FRAMES_MAX
+
+    def interpret(self, statements):
+        function = Compiler().compile(statements)
+        if self.disassemble:
+            print(disassemble(function))
+        self.run_function(function)
+
+    def run_function(self, function):
+        closure = VMClosure(function)
+        self.stack.append(closure)
+        self.call_closure(closure, 0)
+        return self.run(len(self.frames) - 1)
+
+    def call_from_host(self, closure, receiver, arguments):
+        self.stack.append(receiver if receiver is not None else closure)
+        self.stack.extend(arguments)
+        self.call_closure(closure, len(arguments))
+        return self.run(len(self.frames) - 1)
+
+    def reset(self):
+        self.stack.clear()
+        self.frames.clear()
+        self.open_upvalues.clear()
+
+    def runtime_error(self, message):
+        trace = self.stack_trace()
+        self.reset()
+        raise RuntimeError(f"{message}\n{trace}")
+
+    def stack_trace(self):
+        lines = []
+        repeated = 0
+        for frame in reversed(self.frames):
+            function = frame.closure.function
+            name = "script" if function.name is None else f"{function.name}()"
+            line = f"[line {function.chunk.lines[frame.ip - 1]}] in {name}"
+            if lines and lines[-1] == line:
+                repeated += 1
+                continue
+            if repeated:
+                lines.append(f"[Previous line repeated {repeated} more times]")
+                repeated = 0
+            lines.append(line)
+        if repeated:
+            lines.append(f"[Previous line repeated {repeated} more times]")
+        return "\n".join(lines)
+
+    def call_closure(self, closure, argc):
+        function = closure.function
+        if argc != function.arity:
+            self.runtime_error(f"Expected {function.arity} arguments but got {argc}.")
+        if len(self.frames) == self.max_frames:
+            self.runtime_error("Stack overflow.")
+        self.frames.append(CallFrame(closure, len(self.stack) - argc - 1))
+        return True
+
+    def call_value(self, callee, argc):
+        if isinstance(callee, VMClosure):
+            return self.call_closure(callee, argc)
+        if isinstance(callee, BoundMethod):
+            self.stack[-argc - 1] = callee.receiver
+            return self.call_closure(callee.method, argc)
+        if isinstance(callee, LoxClass):
+            self.stack[-argc - 1] = LoxInstance(callee)
+            initializer = callee.initializer
+            if initializer is not None:
+                return self.call_closure(initializer, argc)
+            if argc != 0:
+                self.runtime_error(f"Expected 0 arguments but got {argc}.")
+            return False
+        if isinstance(callee, LoxCallable):
+            if argc != callee.arity():
+                self.runtime_error(f"Expected {callee.arity()} arguments but got {argc}.")
+            stack = self.stack
+            arguments = stack[len(stack) - argc:]
+            result = callee.call(self, arguments)
+            del stack[len(stack) - argc - 1:]
+            stack.append(result)
+            return False
+        self.runtime_error("Can only call functions and classes.")
+
+    def invoke_from_class(self, klass, name, argc):
+        method = klass.find_method(name)
+        if method is None:
+            self.runtime_error(f"Undefined property '{name}'.")
+        return self.call_closure(method, argc)
+
+    def invoke(self, name, argc):
+        receiver = self.stack[-argc - 1]
+        if not isinstance(receiver, LoxInstance):
+            self.runtime_error("Only instances have methods.")
+        index = receiver.shape.fields.get(name)
+        if index is not None:
+            value = receiver.values[index]
+            self.stack[-argc - 1] = value
+            return self.call_value(value, argc)
+        return self.invoke_from_class(receiver.klass, name, argc)
+
+    def bind_method(self, klass, name):
+        method = klass.find_method(name)
+        if method is None:
+            self.runtime_error(f"Undefined property '{name}'.")
+        self.stack[-1] = BoundMethod(self.stack[-1], method)
+
+    def capture_upvalue(self, location):
+        for upvalue in self.open_upvalues:
+            if upvalue.location == location:
+                return upvalue
+        upvalue = Upvalue(location)
+        self.open_upvalues.append(upvalue)
+        return upvalue
+
+    def close_upvalues(self, last):
+        stack = self.stack
+        remaining = []
+        for upvalue in self.open_upvalues:
+            if upvalue.location >= last:
+                upvalue.value = stack[upvalue.location]
+                upvalue.closed = True
+            else:
+                remaining.append(upvalue)
+        self.open_upvalues = remaining
+
+    def run(self, exit_depth):
+        stack = self.stack
+        frames = self.frames
+        push = stack.append
+        pop = stack.pop
+        globals_ = self.globals.values
+        stringify = self.stringify
+
+        frame = frames[-1]
+        closure = frame.closure
+        chunk = closure.function.chunk
+        code = chunk.code
+        constants = chunk.constants
+        ip = frame.ip
+        base = frame.base
+
+        try:
+            while True:
+                op = code[ip]
+                ip += 1
+
+                if op == OP_GET_LOCAL:
+                    push(stack[base + code[ip]])
+                    ip += 1
+                elif op == OP_CONSTANT:
+                    push(constants[(code[ip] << 8) | code[ip + 1]])
+                    ip += 2
+                elif op == OP_SET_LOCAL:
+                    stack[base + code[ip]] = stack[-1]
+                    ip += 1
+                elif op == OP_POP:
+                    pop()
+                elif op == OP_ADD:
+                    b = pop()
+                    a = stack[-1]
+                    if a.__class__ is float and b.__class__ is float:
+                        stack[-1] = a + b
+                    else:
+                        stack[-1] = add(a, b)
+                elif op == OP_SUBTRACT:
+                    b = pop()
+                    stack[-1] = stack[-1] - b
+                elif op == OP_LESS:
+                    b = pop()
+                    stack[-1] = stack[-1] < b
+                elif op == OP_JUMP_IF_FALSE:
+                    value = stack[-1]
+                    if value is None or value is False:
+                        ip += (code[ip] << 8) | code[ip + 1]
+                    ip += 2
+                elif op == OP_LOOP:
+                    ip -= ((code[ip] << 8) | code[ip + 1]) - 2
+                elif op == OP_JUMP:
+                    ip += ((code[ip] << 8) | code[ip + 1]) + 2
+                elif op == OP_GET_GLOBAL:
+                    name = constants[(code[ip] << 8) | code[ip + 1]]
+                    ip += 2
+                    try:
+                        push(globals_[name])
+                    except KeyError:
+                        frame.ip = ip
+                        self.runtime_error(f"Undefined variable '{name}'.")
+                elif op == OP_GET_UPVALUE:
+                    upvalue = closure.upvalues[code[ip]]
+                    ip += 1
+                    push(upvalue.value if upvalue.closed else stack[upvalue.location])
+                elif op == OP_MULTIPLY:
+                    b = pop()
+                    stack[-1] = stack[-1] * b
+                elif op == OP_DIVIDE:
+                    b = pop()
+                    stack[-1] = stack[-1] / b
+                elif op == OP_GREATER:
+                    b = pop()
+                    stack[-1] = stack[-1] > b
+                elif op == OP_GREATER_EQUAL:
+                    b = pop()
+                    stack[-1] = stack[-1] >= b
+                elif op == OP_LESS_EQUAL:
+                    b = pop()
+                    stack[-1] = stack[-1] <= b
+                elif op == OP_EQUAL:
+                    b = pop()
+                    stack[-1] = stack[-1] == b
+                elif op == OP_NOT_EQUAL:
+                    b = pop()
+                    stack[-1] = stack[-1] != b
+                elif op == OP_CALL:
+                    argc = code[ip]
+                    frame.ip = ip + 1
+                    if self.call_value(stack[-argc - 1], argc):
+                        frame = frames[-1]
+                        closure = frame.closure
+                        chunk = closure.function.chunk
+                        code = chunk.code
+                        constants = chunk.constants
+                        base = frame.base
+                        ip = 0
+                    else:
+                        ip += 1
+                elif op == OP_INVOKE:
+                    name = constants[(code[ip] << 8) | code[ip + 1]]
+                    argc = code[ip + 2]
+                    frame.ip = ip + 3
+                    if self.invoke(name, argc):
+                        frame = frames[-1]
+                        closure = frame.closure
+                        chunk = closure.function.chunk
+                        code = chunk.code
+                        constants = chunk.constants
+                        base = frame.base
+                        ip = 0
+                    else:
+                        ip += 3
+                elif op == OP_RETURN:
+                    result = pop()
+                    if self.open_upvalues:
+                        self.close_upvalues(base)
+                    frames.pop()
+                    del stack[base:]
+                    if len(frames) == exit_depth:
+                        return result
+                    push(result)
+                    frame = frames[-1]
+                    closure = frame.closure
+                    chunk = closure.function.chunk
+                    code = chunk.code
+                    constants = chunk.constants
+                    base = frame.base
+                    ip = frame.ip
+                elif op == OP_SET_GLOBAL:
+                    name = constants[(code[ip] << 8) | code[ip + 1]]
+                    ip += 2
+                    if name not in globals_:
+                        frame.ip = ip
+                        self.runtime_error(f"Undefined variable '{name}'.")
+                    globals_[name] = stack[-1]
+                elif op == OP_SET_UPVALUE:
+                    upvalue = closure.upvalues[code[ip]]
+                    ip += 1
+                    if upvalue.closed:
+                        upvalue.value = stack[-1]
+                    else:
+                        stack[upvalue.location] = stack[-1]
+                elif op == OP_GET_PROPERTY:
+                    name = constants[(code[ip] << 8) | code[ip + 1]]
+                    ip += 2
+                    instance = stack[-1]
+                    if not isinstance(instance, LoxInstance):
+                        frame.ip = ip
+                        self.runtime_error("Only instances have properties.")
+                    index = instance.shape.fields.get(name)
+                    if index is not None:
+                        stack[-1] = instance.values[index]
+                    else:
+                        frame.ip = ip
+                        self.bind_method(instance.klass, name)
+                elif op == OP_SET_PROPERTY:
+                    name = constants[(code[ip] << 8) | code[ip + 1]]
+                    ip += 2
+                    value = pop()
+                    instance = stack[-1]
+                    if not isinstance(instance, LoxInstance):
+                        frame.ip = ip
+                        self.runtime_error("Only instances have fields.")
+                    instance.set(name, value)
+                    stack[-1] = value
+                elif op == OP_NIL:
+                    push(None)
+                elif op == OP_TRUE:
+                    push(True)
+                elif op == OP_FALSE:
+                    push(False)
+                elif op == OP_NOT:
+                    value = stack[-1]
+                    stack[-1] = value is None or value is False
+                elif op == OP_NEGATE:
+                    stack[-1] = -stack[-1]
+                elif op == OP_PRINT:
+                    print(stringify(pop()))
+                elif op == OP_DEFINE_GLOBAL:
+                    globals_[constants[(code[ip] << 8) | code[ip + 1]]] = pop()
+                    ip += 2
+                elif op == OP_CLOSURE:
+                    function = constants[(code[ip] << 8) | code[ip + 1]]
+                    ip += 2
+                    new_closure = VMClosure(function)
+                    upvalues = new_closure.upvalues
+                    for i in range(function.upvalue_count):
+                        is_local = code[ip]
+                        index = code[ip + 1]
+                        ip += 2
+                        if is_local:
+                            upvalues[i] = self.capture_upvalue(base + index)
+                        else:
+                            upvalues[i] = closure.upvalues[index]
+                    push(new_closure)
+                elif op == OP_CLOSE_UPVALUE:
+                    self.close_upvalues(len(stack) - 1)
+                    pop()
+                elif op == OP_GET_SUPER:
+                    name = constants[(code[ip] << 8) | code[ip + 1]]
+                    ip += 2
+                    frame.ip = ip
+                    superclass = pop()
+                    self.bind_method(superclass, name)
+                elif op == OP_SUPER_INVOKE:
+                    name = constants[(code[ip] << 8) | code[ip + 1]]
+                    argc = code[ip + 2]
+                    frame.ip = ip + 3
+                    superclass = pop()
+                    if self.invoke_from_class(superclass, name, argc):
+                        frame = frames[-1]
+                        closure = frame.closure
+                        chunk = closure.function.chunk
+                        code = chunk.code
+                        constants = chunk.constants
+                        base = frame.base
+                        ip = 0
+                elif op == OP_CLASS:
+                    push(LoxClass(constants[(code[ip] << 8) | code[ip + 1]], None, {}))
+                    ip += 2
+                elif op == OP_INHERIT:
+                    superclass = stack[-2]
+                    if not isinstance(superclass, LoxClass):
+                        frame.ip = ip
+                        self.runtime_error("Superclass must be a class.")
+                    pop().inherit(superclass)
+                elif op == OP_METHOD:
+                    name = constants[(code[ip] << 8) | code[ip + 1]]
+                    ip += 2
+                    method = pop()
+                    stack[-1].add_method(name, method)
+                else:
+                    frame.ip = ip
+                    self.runtime_error(f"Unknown opcode {op}.")
+        except (TypeError, ZeroDivisionError) as error:
+            frame.ip = ip
+            self.runtime_error(str(error))
@@ -0,0 +1,20 @@
+import os
+from lox import expr, stmt
+from lox.scanner import Scanner
+from lox.parser import Parser
+from tools.generate_ast import main
+
+def test_node_modules_match_the_generator(tmp_path):
+    main(str(tmp_path))
+    package = os.path.dirname(expr.__file__)
+    for name in ("expr.py", "stmt.py"):
+        with open(os.path.join(package, name)) as checked_in:
+            assert (tmp_path / name).read_text() == checked_in.read()
+
+def test_nodes_are_slotted_with_unique_kinds():
+    nodes = expr.EXPR_NODES + stmt.STMT_NODES
+    assert [cls.kind for cls in nodes] == list(range(len(nodes)))
+    node = Parser(Scanner("print 1\n + 2;").scan_tokens()).parse()[0]
+    assert not hasattr(node, "__dict__")
+    assert node.expression.line == 2
+    assert node.expression.left.line is None
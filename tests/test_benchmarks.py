@@ -0,0 +1,20 @@
+from benchmarks.run import BENCHMARKS, PHASES, compare, run_once
+
+def result(total, output="1\n"):
+    return {"total": {"median": total}, "output": output}
+
+def test_suite_has_the_standard_workloads():
+    assert BENCHMARKS == ["binary_trees", "early_return", "equality", "fib", "inherited_init",
+                          "inherited_method", "instantiation", "method_call", "method_return",
+                          "properties", "string_equality", "trees", "zoo"]
+
+def test_run_once_times_every_phase():
+    timings, output = run_once("closure", "print 1 + 2;")
+    assert set(timings) == set(PHASES) | {"total"}
+    assert output == "3\n"
+
+def test_compare_flags_slowdowns_and_changed_output(capsys):
+    baseline = {"fib": {"tree": result(1.0)}, "zoo": {"tree": result(1.0)}, "trees": {"tree": result(1.0)}}
+    results = {"fib": {"tree": result(1.05)}, "zoo": {"tree": result(1.5)}, "trees": {"tree": result(0.5, "2\n")}}
+    regressions = compare(results, baseline, 0.10)
+    assert [(name, engine) for name, engine, _ in regressions] == [("zoo", "tree"), ("trees", "tree")]
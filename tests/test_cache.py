@@ -0,0 +1,53 @@
+from lox import cache
+from lox.lox import Lox
+from tests.test_closure_engine import PROGRAM
+
+def run_script(path, capsys, **options):
+    Lox(**options).run_file(str(path))
+    return capsys.readouterr().out
+
+def test_second_run_loads_the_cached_program(tmp_path, capsys, monkeypatch):
+    script = tmp_path / "program.lox"
+    script.write_text(PROGRAM)
+    expected = run_script(script, capsys, use_cache=False)
+    assert run_script(script, capsys) == expected
+    assert (tmp_path / "__loxcache__" / "program.loxc").exists()
+    monkeypatch.setattr(Lox, "parse", None)
+    for engine in ("tree", "closure", "vm", "python"):
+        assert run_script(script, capsys, engine=engine) == expected
+
+def test_changed_or_corrupt_cache_is_ignored(tmp_path, capsys):
+    script = tmp_path / "program.lox"
+    script.write_text('print "one";')
+    run_script(script, capsys)
+    script.write_text('print "two";')
+    assert run_script(script, capsys) == "two\n"
+    path = cache.cache_path(str(script))
+    with open(path, "r+b") as file:
+        file.seek(40)
+        file.write(b"garbage")
+    assert cache.load(str(script), 'print "two";') is None
+    assert run_script(script, capsys) == "two\n"
+    cache.clear(str(script))
+    assert not (tmp_path / "__loxcache__").exists()
+
+def test_clear_keeps_other_scripts_cached(tmp_path, capsys):
+    first = tmp_path / "first.lox"
+    second = tmp_path / "second.lox"
+    first.write_text('print "first";')
+    second.write_text('print "second";')
+    run_script(first, capsys)
+    run_script(second, capsys)
+    cache.clear(str(first))
+    assert not (tmp_path / "__loxcache__" / "first.loxc").exists()
+    assert cache.load(str(second), 'print "second";') is not None
+
+def test_too_deeply_nested_cache_is_a_miss(tmp_path, capsys, monkeypatch):
+    script = tmp_path / "program.lox"
+    script.write_text('print "one";')
+    run_script(script, capsys)
+    def decode(codes, fields, constants):
+        raise RecursionError
+    monkeypatch.setattr(cache, "decode", decode)
+    assert cache.load(str(script), 'print "one";') is None
+    assert run_script(script, capsys) == "one\n"
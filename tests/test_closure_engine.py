@@ -0,0 +1,109 @@
+import pytest
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.interpreter import Interpreter
+from lox.closure_engine import ClosureInterpreter
+from lox.lox import Lox
+
+PROGRAM = """
+fun fib(n) {
+  if (n < 2) return n;
+  return fib(n - 1) + fib(n - 2);
+}
+print fib(15);
+
+fun make_counter() {
+  var count = 0;
+  fun counter() {
+    count = count + 1;
+    return count;
+  }
+  return counter;
+}
+var counter = make_counter();
+counter();
+print counter();
+
+class Shape {
+  init(name) { this.name = name; }
+  describe() { return this.name + " with area " + this.area(); }
+}
+class Square < Shape {
+  init(side) {
+    super.init("square");
+    this.side = side;
+  }
+  area() { return this.side * this.side; }
+}
+print Square(3).describe();
+
+var total = 0;
+for (var i = 0; i < 10; i = i + 1) {
+  if (i == 5 or i == 7) total = total + i;
+}
+print total;
+print !nil and 0;
+if (0) print "zero is truthy";
+"""
+
+def run(engine, source, capsys):
+    tokens = Scanner(source).scan_tokens()
+    statements = Parser(tokens).parse()
+    Resolver().resolve_stmts(statements)
+    engine().interpret(statements)
+    return capsys.readouterr().out
+
+def test_matches_tree_interpreter(capsys):
+    expected = run(Interpreter, PROGRAM, capsys)
+    assert run(ClosureInterpreter, PROGRAM, capsys) == expected
+    assert expected.splitlines() == ["610", "2", "square with area 9", "12", "0", "zero is truthy"]
+
+def test_globals_are_shared_with_interpreter(capsys):
+    tokens = Scanner("var a = 1 + 2 * 3;").scan_tokens()
+    interpreter = ClosureInterpreter()
+    interpreter.interpret(Parser(tokens).parse())
+    assert interpreter.globals.values["a"] == 7
+
+TAIL_CALLS = """
+fun loop(n, acc) {
+  if (n == 0) return acc;
+  return loop(n - 1, acc + 1);
+}
+print loop(20000, 0);
+
+fun even(n) { if (n == 0) return true; return odd(n - 1); }
+fun odd(n) { if (n == 0) return false; return even(n - 1); }
+print even(20001);
+
+class Counter {
+  init(limit) { this.limit = limit; }
+  count(n) {
+    if (n >= this.limit) return n;
+    return this.count(n + 1);
+  }
+}
+class Twice < Counter {
+  count(n) { return super.count(n + 1); }
+}
+print Twice(20000).count(0);
+fun make() { return Counter(3); }
+print make().limit;
+"""
+
+def test_tail_calls_run_in_constant_stack(capsys):
+    for engine in (Interpreter, ClosureInterpreter):
+        assert run(engine, TAIL_CALLS, capsys).splitlines() == ["20000", "False", "20001", "3"]
+
+def test_lazy_bodies_match_eager_parsing(capsys):
+    for engine in ("tree", "closure"):
+        Lox(engine, lazy=True).run(PROGRAM + TAIL_CALLS)
+        assert capsys.readouterr().out.splitlines() == ["610", "2", "square with area 9", "12", "0", "zero is truthy", "20000", "False", "20001", "3"]
+
+def test_lazy_bodies_are_resolved_on_first_call(capsys):
+    for engine in ("tree", "closure"):
+        lox = Lox(engine, lazy=True)
+        lox.run("fun bad() { return this; } print 1;")
+        assert capsys.readouterr().out == "1\n"
+        with pytest.raises(ValueError):
+            lox.run("bad();")
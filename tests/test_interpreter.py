@@ -1,5 +1,6 @@
 from lox.scanner import Scanner
 from lox.parser import Parser
+from lox.resolver import Resolver
 from lox.interpreter import Interpreter
 
 def interpret(source):
@@ -8,6 +9,7 @@ def interpret(source):
 
     parser = Parser(tokens)
     statements = parser.parse()
+    Resolver().resolve_stmts(statements)
 
     interpreter = Interpreter()
     interpreter.interpret(statements)
@@ -18,4 +20,14 @@ def test_var_declaration():
     interpreter = interpret("var a = 10;")
 
     assert "a" in interpreter.globals.values
-    assert interpreter.globals.values["a"] == 10
\ No newline at end of file
+    assert interpreter.globals.values["a"] == 10
+
+def test_operator_handlers_are_cached_on_nodes():
+    statements = Parser(Scanner('var a = 1; var b = a + 2 == 3; var c = "x" + a; var d = -a;').scan_tokens()).parse()
+    interpreter = Interpreter()
+    interpreter.interpret(statements)
+    assert interpreter.globals.values["b"] is True
+    assert interpreter.globals.values["c"] == "x1"
+    assert interpreter.globals.values["d"] == -1
+    assert statements[1].initializer.handler is not None
+    assert statements[3].initializer.handler is not None
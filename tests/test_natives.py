@@ -0,0 +1,75 @@
+import pytest
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.lox import ENGINES
+
+def run(engine, source, capsys):
+    statements = Parser(Scanner(source).scan_tokens()).parse()
+    Resolver().resolve_stmts(statements)
+    engine.interpret(statements)
+    return capsys.readouterr().out.splitlines()
+
+PROGRAM = """
+print clock() > 0;
+print sqrt(16) + abs(-2) + floor(2.7) + ceil(2.1) + round(2.5) + pow(2, 10);
+print min(3, 4) + max(3, 4);
+print len("hello") + indexOf("hello", "ll") + indexOf("hello", "z");
+print substring("hello world", 6, 11);
+print parseNumber("3.5") * 2;
+print parseNumber("abc");
+print formatNumber(3.14159, 2) + " " + toString(12);
+print clock;
+"""
+
+@pytest.mark.parametrize("name", sorted(ENGINES))
+def test_standard_library(name, capsys):
+    assert run(ENGINES[name](), PROGRAM, capsys) == [
+        "True", "1038", "7", "6", "world", "7", "nil", "3.14 12", "<native fn>",
+    ]
+
+@pytest.mark.parametrize("name", sorted(ENGINES))
+def test_define_native(name, capsys):
+    interpreter = ENGINES[name]()
+    interpreter.define_native("twice", 1, lambda x: x * 2)
+    assert run(interpreter, "fun f(x) { return twice(x) + 1; } print f(20);", capsys) == ["41"]
+
+def test_natives_check_their_arguments():
+    with pytest.raises(RuntimeError, match="must be a string"):
+        ENGINES["tree"]().globals.values["len"].call(None, [1.0])
+    with pytest.raises(RuntimeError, match="out of range"):
+        ENGINES["tree"]().globals.values["substring"].call(None, ["abc", 1.0, 5.0])
+
+LISTS = """
+var l = list();
+for (var i = 5; i > 0; i = i - 1) append(l, i);
+set(l, 1, "x");
+print l;
+print len(l) + get(l, 0);
+print pop(l);
+var m = slice(l, 1, 3);
+set(l, 1, 4);
+sort(l);
+print l;
+reverse(l);
+extend(l, m);
+print join(l, "-");
+print l == l;
+print slice(l, 0, 1) == slice(l, 0, 1);
+"""
+
+@pytest.mark.parametrize("name", sorted(ENGINES))
+def test_lists(name, capsys):
+    assert run(ENGINES[name](), LISTS, capsys) == [
+        "[5, x, 3, 2, 1]", "10", "1", "[2, 3, 4, 5]", "5-4-3-2-x-3", "True", "False",
+    ]
+
+def test_list_errors():
+    natives = ENGINES["tree"]().globals.values
+    items = natives["list"].call(None, [])
+    with pytest.raises(RuntimeError, match="out of range"):
+        natives["get"].call(None, [items, 0.0])
+    natives["append"].call(None, [items, "a"])
+    natives["append"].call(None, [items, 1.0])
+    with pytest.raises(RuntimeError, match="Can only sort"):
+        natives["sort"].call(None, [items])
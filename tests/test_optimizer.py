@@ -0,0 +1,33 @@
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.optimizer import Optimizer
+from lox.expr import Binary
+from lox.stmt import Print, Return
+
+def optimize(source):
+    statements = Parser(Scanner(source).scan_tokens()).parse()
+    Resolver().resolve_stmts(statements)
+    optimizer = Optimizer()
+    return optimizer.optimize(statements), optimizer
+
+def test_folds_arithmetic_and_concatenation():
+    statements, optimizer = optimize('print (1 + 2) * -3; print "a" + "b";')
+    assert [stmt.expression.value for stmt in statements] == [-9.0, "ab"]
+    assert optimizer.report() == ["4 constant expressions folded"]
+
+def test_leaves_runtime_errors_alone():
+    statements, _ = optimize('print 1 / 0; print "a" + 1; print nil < 1;')
+    assert all(isinstance(stmt.expression, Binary) for stmt in statements)
+
+def test_removes_dead_branches_loops_and_unreachable_code():
+    source = """
+    if (false) print 1; else print 2;
+    while (nil) print 3;
+    fun f() { return 4; print 5; }
+    """
+    statements, optimizer = optimize(source)
+    assert isinstance(statements[0], Print) and statements[0].expression.value == 2.0
+    assert len(statements) == 2
+    assert len(statements[1].body) == 1 and isinstance(statements[1].body[0], Return)
+    assert optimizer.report() == ["1 dead branches removed", "1 dead loops removed", "1 unreachable statements removed"]
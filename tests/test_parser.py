@@ -1,6 +1,8 @@
+import pytest
 from lox.scanner import Scanner
 from lox.parser import Parser
 from lox.expr import Binary, Literal
+from lox.lox import Lox
 
 def parse_expr(source):
     tokens = Scanner(source).scan_tokens()
@@ -16,3 +18,55 @@ def test_binary_expression():
     assert expr.left.value == 1
     assert expr.operator.lexeme == "+"
     assert expr.right.value == 2
+
+def test_declarations_are_parsed_lazily_from_a_token_stream():
+    tokens = Scanner("print 1; print 2; print").scan()
+    declarations = Parser(tokens).declarations()
+    assert next(declarations).expression.value == 1
+    assert next(declarations).expression.value == 2
+
+def test_stream_mode_runs_each_declaration_before_parsing_the_next(capsys):
+    with pytest.raises(ValueError):
+        Lox(stream=True).run('print "first"; { var a = a; }')
+    assert capsys.readouterr().out == "first\n"
+
+def test_parses_from_a_token_buffer():
+    source = "fun f(a) { return a * 2; } print f(3) + 1;"
+    statements = Parser(Scanner(source).scan_buffer()).parse()
+    assert [type(stmt).__name__ for stmt in statements] == ["Function", "Print"]
+    assert statements[0].params[0].lexeme == "a"
+    assert statements[1].expression.right.value == 1.0
+
+def test_precedence_and_associativity():
+    expr = parse_expr("a = b.c = 1 - 2 - -3 * 4 < 5 == !x or y and z;").expression
+    assert type(expr).__name__ == "Assign" and type(expr.value).__name__ == "Set"
+    logical = expr.value.value
+    assert logical.operator.lexeme == "or" and logical.right.operator.lexeme == "and"
+    equality = logical.left
+    assert equality.operator.lexeme == "==" and type(equality.right).__name__ == "Unary"
+    comparison = equality.left
+    assert comparison.operator.lexeme == "<"
+    difference = comparison.left
+    assert difference.operator.lexeme == "-" and difference.left.operator.lexeme == "-"
+    assert difference.right.operator.lexeme == "*" and difference.right.left.operator.lexeme == "-"
+
+def test_calls_and_properties_bind_tighter_than_unary():
+    expr = parse_expr("-f(1)(2).g;").expression
+    assert type(expr).__name__ == "Unary"
+    assert type(expr.right).__name__ == "Get"
+    assert type(expr.right.object.callee).__name__ == "Call"
+
+def test_lazy_mode_skips_top_level_function_bodies():
+    source = "fun f(a) { fun g() { return a; } return g; } class C { m() { print 1; } } { fun h() { print 2; } }"
+    function, klass, block = Parser(Scanner(source).scan_buffer(), lazy=True).parse()
+    assert function.body is None and [param.lexeme for param in function.params] == ["a"]
+    assert klass.methods[0].body is None
+    assert block.statements[0].body is not None
+    body = function.lazy_body.parse()
+    assert [type(stmt).__name__ for stmt in body] == ["Function", "Return"]
+    assert body[0].body is not None
+
+def test_lazy_mode_parses_unbalanced_bodies_eagerly():
+    function = Parser(Scanner("fun f() { print 1;").scan_buffer(), lazy=True).parse()[0]
+    assert function.lazy_body is None
+    assert len(function.body) == 1
@@ -0,0 +1,54 @@
+from lox.interpreter import Interpreter
+from lox.closure_engine import ClosureInterpreter
+from lox.objects import LoxFunction
+from lox.profiler import Profiler
+from tests.test_closure_engine import run
+
+SOURCE = """
+fun fib(n) {
+  if (n < 2) return n;
+  return fib(n - 1) + fib(n - 2);
+}
+class Base { init() { this.n = fib(5); } }
+class Leaf < Base { get() { return this.n; } }
+print Leaf().get();
+"""
+
+def test_counts_calls_and_builds_stacks(capsys):
+    original = LoxFunction.enter_tail
+    for engine in (Interpreter, ClosureInterpreter):
+        profiler = Profiler()
+        profiler.install()
+        try:
+            assert run(engine, SOURCE, capsys) == "5\n"
+        finally:
+            profiler.uninstall()
+        calls = {name: stats[0] for name, stats in profiler.stats.items()}
+        assert calls == {"fib (line 2)": 15, "Base.init (line 6)": 1, "Leaf()": 1, "Leaf.get (line 7)": 1}
+        stacks = profiler.collapsed_stacks()
+        assert "<script>;Leaf();Base.init (line 6);fib (line 2);fib (line 2) " in stacks
+        assert "function" in profiler.report().splitlines()[0]
+    assert LoxFunction.enter_tail is original
+
+TAIL_CALLS = """
+fun loop(n) {
+  if (n == 0) return n;
+  return loop(n - 1);
+}
+fun helper(x) { return x + 1; }
+fun caller(x) { return helper(x); }
+print loop(100);
+print caller(1);
+"""
+
+def test_counts_calls_completed_by_the_trampoline(capsys):
+    for engine in (Interpreter, ClosureInterpreter):
+        profiler = Profiler()
+        profiler.install()
+        try:
+            assert run(engine, TAIL_CALLS, capsys) == "0\n2\n"
+        finally:
+            profiler.uninstall()
+        calls = {name: stats[0] for name, stats in profiler.stats.items()}
+        assert calls == {"loop (line 2)": 101, "caller (line 7)": 1, "helper (line 6)": 1}
+        assert "<script>;helper (line 6) " in profiler.collapsed_stacks()
@@ -0,0 +1,35 @@
+import pytest
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.resolver import Resolver
+
+def resolve(source):
+    statements = Parser(Scanner(source).scan_tokens()).parse()
+    Resolver().resolve_stmts(statements)
+    return statements
+
+def test_locals_get_depth_and_slot():
+    block = resolve("{ var a = 1; var b = 2; { print a + b; } }")[0]
+    assert block.slot_count == 2
+    inner = block.statements[2]
+    expr = inner.statements[0].expression
+    assert (expr.left.depth, expr.left.slot) == (1, 0)
+    assert (expr.right.depth, expr.right.slot) == (1, 1)
+
+def test_globals_stay_unresolved():
+    stmt = resolve("var a = 1; print a;")[1]
+    assert stmt.expression.depth is None
+
+def test_function_slots_follow_parameters():
+    function = resolve("fun f(a, b) { var c = a; return c; }")[0]
+    assert function.slot_count == 3
+    assert function.body[0].slot == 2
+
+def test_reading_local_in_own_initializer_is_an_error():
+    with pytest.raises(ValueError):
+        resolve("{ var a = a; }")
+
+def test_returned_calls_are_marked_as_tail_calls():
+    function = resolve("fun f(n) { if (n) return f(n - 1); return 1 + f(n); }")[0]
+    assert function.body[0].then_branch.tail_call
+    assert not function.body[1].tail_call
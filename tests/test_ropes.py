@@ -0,0 +1,42 @@
+import pytest
+from lox.lox import ENGINES
+from lox.operators import ROPE_THRESHOLD, Rope, add
+from tests.test_natives import run
+
+def test_long_concatenations_append_to_a_shared_rope():
+    text = add("a" * ROPE_THRESHOLD, "b")
+    assert text.__class__ is Rope
+    longer = add(add(text, "c"), 1.0)
+    assert longer.parts is text.parts
+    assert str(longer) == "a" * ROPE_THRESHOLD + "bc1"
+    assert add("x", "y") == "xy"
+
+def test_appending_to_an_older_rope_copies():
+    base = add("a" * ROPE_THRESHOLD, "")
+    first = add(base, "1")
+    second = add(base, "2")
+    assert str(first).endswith("1") and str(second).endswith("2")
+    assert first.parts is not second.parts
+
+def test_ropes_compare_like_strings():
+    rope = add("a" * ROPE_THRESHOLD, "b")
+    assert rope == "a" * ROPE_THRESHOLD + "b"
+    assert "a" * ROPE_THRESHOLD + "b" == rope
+    assert rope != 1.0
+    assert hash(rope) == hash(str(rope))
+
+PROGRAM = """
+var s = "";
+for (var i = 0; i < 300; i = i + 1) s = s + "ab";
+var t = s + "!";
+var u = s + "?";
+print len(s);
+print substring(t, 598, 601) + substring(u, 598, 601);
+print s == substring(t, 0, 600);
+print s != t;
+print indexOf(t, "!");
+"""
+
+@pytest.mark.parametrize("name", sorted(ENGINES))
+def test_engines_build_ropes(name, capsys):
+    assert run(ENGINES[name](), PROGRAM, capsys) == ["600", "ab!ab?", "True", "True", "600"]
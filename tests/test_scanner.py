@@ -14,3 +14,47 @@ def test_string_literal():
     tokens = scan('"hello"')
     assert tokens[0].token_type == TokenType.STRING
     assert tokens[0].literal == "hello"
+
+def describe(tokens):
+    return [(token.token_type, token.lexeme, token.literal, token.line) for token in tokens]
+
+def test_tokens_and_lines():
+    source = 'var x = 1.5; // comment\nprint "a\nb" >= x.y;\n'
+    assert describe(Scanner(source).scan_tokens()) == [
+        (TokenType.VAR, "var", None, 1),
+        (TokenType.IDENTIFIER, "x", None, 1),
+        (TokenType.EQUAL, "=", None, 1),
+        (TokenType.NUMBER, "1.5", 1.5, 1),
+        (TokenType.SEMICOLON, ";", None, 1),
+        (TokenType.PRINT, "print", None, 2),
+        (TokenType.STRING, '"a\nb"', "a\nb", 3),
+        (TokenType.GREATER_EQUAL, ">=", None, 3),
+        (TokenType.IDENTIFIER, "x", None, 3),
+        (TokenType.DOT, ".", None, 3),
+        (TokenType.IDENTIFIER, "y", None, 3),
+        (TokenType.SEMICOLON, ";", None, 3),
+        (TokenType.EOF, "", None, 4),
+    ]
+
+def test_errors_are_reported_and_skipped(capsys):
+    tokens = Scanner('1. @ "open').scan_tokens()
+    assert [token.token_type for token in tokens] == [TokenType.NUMBER, TokenType.DOT, TokenType.EOF]
+    assert capsys.readouterr().out == "Unexpected character @ at line 1\nUnterminated string at line 1\n"
+
+def test_scan_is_lazy():
+    tokens = Scanner("a b c").scan()
+    assert next(tokens).lexeme == "a"
+    assert [token.lexeme for token in tokens] == ["b", "c", ""]
+
+def test_repeated_names_and_numbers_share_objects():
+    first, _, second, _, one, _, also_one = Scanner("counter + counter; 1.5 + 1.5").scan_tokens()[:7]
+    assert first.lexeme is second.lexeme
+    assert one.lexeme is also_one.lexeme and one.literal is also_one.literal
+    assert not hasattr(first, "__dict__")
+
+def test_buffer_holds_the_same_tokens():
+    source = 'var s = "two\nlines"; print s + 1.5; // done\n@'
+    fields = lambda tokens: [(t.token_type, t.lexeme, t.literal, t.line) for t in tokens]
+    buffer = Scanner(source).scan_buffer()
+    assert fields(buffer) == fields(Scanner(source).scan_tokens())
+    assert buffer.nbytes() == 13 * len(buffer)
@@ -0,0 +1,50 @@
+from lox.interpreter import Interpreter
+from lox.closure_engine import ClosureInterpreter
+from lox.objects import LoxClass, LoxInstance
+from tests.test_closure_engine import run
+
+def test_instances_with_same_field_order_share_a_shape():
+    klass = LoxClass("Point", None, {})
+    a, b, c = LoxInstance(klass), LoxInstance(klass), LoxInstance(klass)
+    a.set("x", 1); a.set("y", 2)
+    b.set("x", 3); b.set("y", 4)
+    c.set("y", 5); c.set("x", 6)
+    assert a.shape is b.shape
+    assert a.shape is not c.shape
+    assert (b.get("x"), c.get("x")) == (3, 6)
+
+POLYMORPHIC = """
+class A { init() { this.x = "a"; } name() { return "A"; } }
+class B { init() { this.y = 0; this.x = "b"; } name() { return "B"; } }
+class C { init() { this.name = "field"; this.x = "c"; } name() { return "C"; } }
+fun show(o) {
+  print o.x;
+  var name = o.name;
+  if (name == "field" or name == "shadowed") print name; else print name();
+}
+for (var i = 0; i < 2; i = i + 1) { show(A()); show(B()); show(C()); }
+var a = A();
+a.name = "shadowed";
+show(a);
+"""
+
+def test_polymorphic_sites_match_uncached_lookup(capsys):
+    for engine in (Interpreter, ClosureInterpreter):
+        lines = run(engine, POLYMORPHIC, capsys).splitlines()
+        assert lines[:6] == ["a", "A", "b", "B", "c", "field"]
+        assert lines[6:12] == lines[:6]
+        assert lines[12:] == ["a", "shadowed"]
+
+def test_methods_are_flattened_and_bound_per_receiver(capsys):
+    source = """
+    class A { init(n) { this.n = n; } get() { fun inner() { return this.n; } return inner; } }
+    class B < A { twice() { return super.get()() * 2; } }
+    var one = B(1);
+    var two = B(2);
+    var get = one.get;
+    print get()();
+    print two.twice();
+    print B(3).init(4).n;
+    """
+    for engine in (Interpreter, ClosureInterpreter):
+        assert run(engine, source, capsys).splitlines() == ["1", "4", "4"]
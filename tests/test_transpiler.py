@@ -0,0 +1,63 @@
+import pytest
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.interpreter import Interpreter
+from lox.transpiler import Transpiler, TranspiledInterpreter
+from tests.test_closure_engine import PROGRAM, run
+
+def transpile(source):
+    return Transpiler().transpile(Parser(Scanner(source).scan_tokens()).parse())
+
+def test_matches_tree_interpreter(capsys):
+    expected = run(Interpreter, PROGRAM, capsys)
+    assert run(TranspiledInterpreter, PROGRAM, capsys) == expected
+
+def test_loop_locals_are_fresh_per_iteration(capsys):
+    source = """
+    var first; var second;
+    for (var i = 0; i < 2; i = i + 1) {
+      var j = i;
+      fun show() { print j; }
+      if (i == 0) first = show; else second = show;
+    }
+    first(); second();
+    """
+    assert run(TranspiledInterpreter, source, capsys) == "0\n1\n"
+
+def test_shadowed_locals_get_distinct_python_names():
+    source = transpile("{ var a = 1; { var a = 2; print a; } print a; }")
+    assert "l1_a = 1.0" in source
+    assert "l2_a = 2.0" in source
+
+def test_undefined_global_is_lox_runtime_error():
+    with pytest.raises(RuntimeError, match="Undefined variable 'missing'"):
+        TranspiledInterpreter().interpret(Parser(Scanner("print missing;").scan_tokens()).parse())
+
+def interpret(source):
+    TranspiledInterpreter().interpret(Parser(Scanner(source).scan_tokens()).parse())
+
+def test_assigning_an_undeclared_global_is_lox_runtime_error(capsys):
+    with pytest.raises(RuntimeError, match="Undefined variable 'x'"):
+        interpret("x = 1; print x;")
+    with pytest.raises(RuntimeError, match="Undefined variable 'y'"):
+        interpret("fun f() { y = 1; } f();")
+    assert capsys.readouterr().out == ""
+    interpret("var z; fun f() { z = 2; } f(); print z;")
+    assert capsys.readouterr().out == "2\n"
+
+def test_wrong_argument_count_is_lox_runtime_error():
+    with pytest.raises(RuntimeError, match="Expected 1 arguments but got 2."):
+        interpret("fun f(a) {} f(1, 2);")
+    with pytest.raises(RuntimeError, match="Expected 0 arguments but got 1."):
+        interpret("class A { m() {} } A().m(1);")
+    with pytest.raises(RuntimeError, match="Expected 1 arguments but got 0."):
+        interpret("class A { init(a) {} } A();")
+    with pytest.raises(RuntimeError, match="Expected 1 arguments but got 0."):
+        interpret("sqrt();")
+
+def test_calling_a_non_callable_is_lox_runtime_error(capsys):
+    with pytest.raises(RuntimeError, match="Can only call functions and classes."):
+        interpret("var a = 1; a(2);")
+    with pytest.raises(RuntimeError, match="Can only call functions and classes."):
+        interpret('fun side() { print "arg"; } "str"(side());')
+    assert capsys.readouterr().out == "arg\n"
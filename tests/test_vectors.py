@@ -0,0 +1,42 @@
+import pytest
+from lox.lox import ENGINES
+from tests.test_natives import run
+
+pytest.importorskip("numpy")
+
+PROGRAM = """
+var v = range(0, 5, 1);
+print v * 2 + 1;
+print 10 - v / 2;
+print v < 2;
+print sum(v < 2);
+print sum(v) + mean(v) + minimum(v) + maximum(v);
+var l = list();
+append(l, 3);
+append(l, 4);
+var w = vector(l);
+print toList(-w * w);
+print len(w);
+print v == v;
+print w == vector(l);
+"""
+
+@pytest.mark.parametrize("name", sorted(ENGINES))
+def test_vector_arithmetic(name, capsys):
+    assert run(ENGINES[name](), PROGRAM, capsys) == [
+        "vector[1, 3, 5, 7, 9]",
+        "vector[10, 9.5, 9, 8.5, 8]",
+        "vector[True, True, False, False, False]",
+        "2",
+        "16",
+        "[-9, -16]",
+        "2",
+        "True",
+        "False",
+    ]
+
+def test_vector_errors(capsys):
+    with pytest.raises(RuntimeError, match="same length"):
+        run(ENGINES["tree"](), "print range(0, 3, 1) + range(0, 2, 1);", capsys)
+    with pytest.raises(RuntimeError, match="empty vector"):
+        run(ENGINES["tree"](), "print sum(range(0, 0, 1));", capsys)
@@ -0,0 +1,68 @@
+import pytest
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.interpreter import Interpreter
+from lox.compiler import Compiler
+from lox.disassembler import disassemble
+from lox.vm import VM
+from tests.test_closure_engine import PROGRAM, run
+
+def compile_source(source):
+    return Compiler().compile(Parser(Scanner(source).scan_tokens()).parse())
+
+def test_matches_tree_interpreter(capsys):
+    expected = run(Interpreter, PROGRAM, capsys)
+    assert run(VM, PROGRAM, capsys) == expected
+
+def test_closures_capture_variables_not_values(capsys):
+    source = """
+    var getter; var setter;
+    {
+      var value = "before";
+      fun get() { return value; }
+      fun set(v) { value = v; }
+      getter = get; setter = set;
+    }
+    setter("after");
+    print getter();
+    """
+    assert run(VM, source, capsys) == "after\n"
+
+def test_disassembler_lists_nested_functions():
+    listing = disassemble(compile_source("fun add(a, b) { return a + b; } print add(1, 2);"))
+    assert "== <fn add> ==" in listing
+    assert "OP_GET_LOCAL        1" in listing
+    assert "OP_CALL             2" in listing
+
+def test_return_outside_function_is_compile_error():
+    with pytest.raises(ValueError):
+        compile_source("return 1;")
+
+def test_recursion_depth_is_not_limited_by_python_stack(capsys):
+    source = "fun sum(n) { if (n == 0) return 0; return n + sum(n - 1); } print sum(20000);"
+    assert run(VM, source, capsys) == "200010000\n"
+
+def test_runtime_errors_carry_a_lox_stack_trace():
+    source = """
+    fun fail(n) {
+      if (n == 0) return nil - 1;
+      return 1 + fail(n - 1);
+    }
+    fun outer() { return fail(3); }
+    outer();
+    """
+    with pytest.raises(RuntimeError) as error:
+        VM().interpret(Parser(Scanner(source).scan_tokens()).parse())
+    assert str(error.value).splitlines()[1:] == [
+        "[line 3] in fail()",
+        "[line 4] in fail()",
+        "[Previous line repeated 2 more times]",
+        "[line 6] in outer()",
+        "[line 7] in script",
+    ]
+
+def test_stack_overflow_respects_max_frames():
+    vm = VM()
+    vm.max_frames = 50
+    with pytest.raises(RuntimeError, match="Stack overflow"):
+        vm.interpret(Parser(Scanner("fun f() { return 1 + f(); } f();").scan_tokens()).parse())
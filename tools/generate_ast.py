@@ -0,0 +1,92 @@
+import os
+import sys
+
+# Node definitions: class name, constructor fields, fields the later passes
+# fill in (with their initial values), and the field that gives the node's
+# source line, if any. Adding a field here adds it to the constructor or the
+# node's __slots__, and so to the .loxc cache format.
+EXPRESSIONS = [
+    ("Assign", ["name", "value"], {"depth": "None", "slot": "None"}, "name"),
+    ("Binary", ["left", "operator", "right"], {"handler": "None"}, "operator"),
+    ("Call", ["callee", "paren", "arguments"], {}, "paren"),
+    ("Get", ["object", "name"], {"cache_shape": "None", "cache_index": "-1", "cache_method": "None", "cache_entries": "None"}, "name"),
+    ("Grouping", ["expression"], {}, "expression"),
+    ("Literal", ["value"], {}, None),
+    ("Logical", ["left", "operator", "right"], {}, "operator"),
+    ("Set", ["object", "name", "value"], {"cache_shape": "None", "cache_index": "-1", "cache_transition": "None", "cache_entries": "None"}, "name"),
+    ("Super", ["keyword", "method"], {"depth": "None", "slot": "None"}, "keyword"),
+    ("This", ["keyword"], {"depth": "None", "slot": "None"}, "keyword"),
+    ("Unary", ["operator", "right"], {"handler": "None"}, "operator"),
+    ("Variable", ["name"], {"depth": "None", "slot": "None"}, "name"),
+]
+
+STATEMENTS = [
+    ("Block", ["statements"], {"slot_count": "0"}, None),
+    ("Class", ["name", "superclass", "methods"], {"slot": "None"}, "name"),
+    ("Expression", ["expression"], {}, "expression"),
+    ("Function", ["name", "params", "body"], {"slot": "None", "slot_count": "len(params)", "lazy_body": "None"}, "name"),
+    ("If", ["condition", "then_branch", "else_branch"], {}, "condition"),
+    ("Print", ["expression"], {}, "expression"),
+    ("Return", ["keyword", "value"], {"tail_call": "False"}, "keyword"),
+    ("Var", ["name", "initializer"], {"slot": "None"}, "name"),
+    ("While", ["condition", "body"], {}, "condition"),
+]
+
+# Kinds are numbered across both modules, so one table indexed by `kind` can
+# cover every node class.
+def define_ast(base, nodes, first_kind):
+    suffix = base.lower()
+    lines = [
+        "# Generated by tools/generate_ast.py from its node definitions; edit those",
+        "# and regenerate instead of changing this file.",
+        "from abc import ABC, abstractmethod",
+        "",
+        f"class {base}(ABC):",
+        "\t__slots__ = ()",
+        "",
+        "\t@abstractmethod",
+        "\tdef accept(self, visitor):",
+        "\t\tpass",
+        "",
+        "\tclass Visitor(ABC):",
+    ]
+    for name, _, _, _ in nodes:
+        lines += [
+            "",
+            "\t\t@abstractmethod",
+            f"\t\tdef visit_{name.lower()}_{suffix}(self, {suffix}):",
+            "\t\t\tpass",
+        ]
+    for kind, (name, fields, annotations, position) in enumerate(nodes, first_kind):
+        slots = ", ".join(f'"{field}"' for field in fields + list(annotations))
+        lines += [
+            "",
+            f"class {name}({base}):",
+            f"\t__slots__ = ({slots},)",
+            f"\tkind = {kind}",
+            "",
+            f"\tdef __init__(self, {', '.join(fields)}):",
+        ]
+        lines += [f"\t\tself.{field} = {field}" for field in fields]
+        lines += [f"\t\tself.{field} = {value}" for field, value in annotations.items()]
+        lines += [
+            "",
+            "\tdef accept(self, visitor):",
+            f"\t\treturn visitor.visit_{name.lower()}_{suffix}(self)",
+            "",
+            "\t@property",
+            "\tdef line(self):",
+            f"\t\treturn self.{position}.line" if position else "\t\treturn None",
+        ]
+    lines += ["", f"{base.upper()}_NODES = ({', '.join(name for name, _, _, _ in nodes)},)"]
+    return "\n".join(lines) + "\n"
+
+def main(output_dir):
+    for base, nodes, first_kind in (("Expr", EXPRESSIONS, 0), ("Stmt", STATEMENTS, len(EXPRESSIONS))):
+        with open(os.path.join(output_dir, base.lower() + ".py"), "w") as file:
+            file.write(define_ast(base, nodes, first_kind))
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python3 tools/generate_ast.py [output directory]")
+    main(sys.argv[1] if len(sys.argv) == 2 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))